@@ -8,6 +8,7 @@ from app.api.roles import router as roles_router
 from app.api.departments import router as departments_router
 from app.api.menus import router as menus_router
 from app.api.plugins import router as plugins_router
+from app.api.monitor import router as monitor_router
 
 api_router = APIRouter(prefix="/api/v1")
 
@@ -17,6 +18,7 @@ api_router.include_router(roles_router)
 api_router.include_router(departments_router)
 api_router.include_router(menus_router)
 api_router.include_router(plugins_router)
+api_router.include_router(monitor_router)
 
 @api_router.get("/health")
 async def health_check():
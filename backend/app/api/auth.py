@@ -1,13 +1,12 @@
 """认证 API 路由。"""
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
-from app.core.response import success
+from app.core.database import get_db, get_primary_read_db
+from app.core.response import json_response, success
 from app.core.security import get_current_user
-from app.models.user import User
-from app.schemas.auth import LoginRequest, RefreshRequest
+from app.schemas.auth import LoginRequest, Principal, RefreshRequest
 from app.services.auth_service import AuthService
 
 router = APIRouter(prefix="/auth", tags=["认证"])
@@ -29,9 +28,18 @@ async def refresh_token(body: RefreshRequest, db: AsyncSession = Depends(get_db)
 
 @router.get("/me")
 async def get_me(
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    request: Request,
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_primary_read_db),
 ):
-    """获取当前用户信息（含权限和菜单）。"""
-    info = await AuthService.get_user_info(db, current_user.id)
-    return success(data=info)
+    """获取当前用户信息（含权限和菜单）。
+
+    支持 ``If-None-Match``：数据未变化时返回 304，不访问数据库。
+    """
+    info, etag = await AuthService.get_cached_user_info(db, current_user.id)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+    return json_response(data=info, headers=headers)
@@ -3,8 +3,9 @@
 from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
-from app.core.response import success
+from app.core.database import get_db, get_primary_read_db
+from app.core.response import json_response, success
+from app.core.permissions import require_permission
 from app.core.security import get_current_user
 from app.schemas.user import DepartmentCreate, DepartmentUpdate
 from app.services.department_service import DepartmentService
@@ -13,20 +14,20 @@ router = APIRouter(prefix="/departments", tags=["部门管理"], dependencies=[D
 
 
 @router.get("/tree")
-async def get_department_tree(db: AsyncSession = Depends(get_db)):
-    """获取部门树。"""
+async def get_department_tree(db: AsyncSession = Depends(get_primary_read_db)):
+    """获取部门树（所有登录用户可用，前端部门选择器依赖此接口）。"""
     tree = await DepartmentService.get_tree(db)
-    return success(data=tree)
+    return json_response(data=tree)
 
 
-@router.post("")
+@router.post("", dependencies=[Depends(require_permission("dept:manage"))])
 async def create_department(body: DepartmentCreate, db: AsyncSession = Depends(get_db)):
     """创建部门。"""
     dept = await DepartmentService.create(db, body)
     return success(data={"id": dept.id, "name": dept.name}, message="创建成功")
 
 
-@router.put("/{dept_id}")
+@router.put("/{dept_id}", dependencies=[Depends(require_permission("dept:manage"))])
 async def update_department(
     dept_id: int, body: DepartmentUpdate, db: AsyncSession = Depends(get_db)
 ):
@@ -35,7 +36,7 @@ async def update_department(
     return success(data={"id": dept.id}, message="更新成功")
 
 
-@router.delete("/{dept_id}")
+@router.delete("/{dept_id}", dependencies=[Depends(require_permission("dept:manage"))])
 async def delete_department(dept_id: int, db: AsyncSession = Depends(get_db)):
     """删除部门。"""
     await DepartmentService.delete(db, dept_id)
@@ -3,8 +3,9 @@
 from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
-from app.core.response import success
+from app.core.database import get_db, get_primary_read_db
+from app.core.response import json_response, success
+from app.core.permissions import require_permission
 from app.core.security import get_current_user
 from app.schemas.user import MenuCreate, MenuUpdate
 from app.services.menu_service import MenuService
@@ -13,20 +14,20 @@ router = APIRouter(prefix="/menus", tags=["菜单管理"], dependencies=[Depends
 
 
 @router.get("/tree")
-async def get_menu_tree(db: AsyncSession = Depends(get_db)):
-    """获取完整菜单树。"""
+async def get_menu_tree(db: AsyncSession = Depends(get_primary_read_db)):
+    """获取完整菜单树（所有登录用户可用）。"""
     tree = await MenuService.get_tree(db)
-    return success(data=tree)
+    return json_response(data=tree)
 
 
-@router.post("")
+@router.post("", dependencies=[Depends(require_permission("menu:manage"))])
 async def create_menu(body: MenuCreate, db: AsyncSession = Depends(get_db)):
     """创建菜单。"""
     menu = await MenuService.create(db, body)
     return success(data={"id": menu.id, "name": menu.name}, message="创建成功")
 
 
-@router.put("/{menu_id}")
+@router.put("/{menu_id}", dependencies=[Depends(require_permission("menu:manage"))])
 async def update_menu(
     menu_id: int, body: MenuUpdate, db: AsyncSession = Depends(get_db)
 ):
@@ -35,7 +36,7 @@ async def update_menu(
     return success(data={"id": menu.id}, message="更新成功")
 
 
-@router.delete("/{menu_id}")
+@router.delete("/{menu_id}", dependencies=[Depends(require_permission("menu:manage"))])
 async def delete_menu(menu_id: int, db: AsyncSession = Depends(get_db)):
     """删除菜单。"""
     await MenuService.delete(db, menu_id)
@@ -0,0 +1,39 @@
+"""运行监控 API 路由。"""
+
+from fastapi import APIRouter, Depends, Query
+
+from app.core.database import engine, replica_router
+from app.core.db_pool import pool_snapshot
+from app.core.hashing import password_hasher
+from app.core.response import success
+from app.core.slow_query import slow_query_log
+from app.core.permissions import require_permission
+from app.core.plugin_engine import plugin_engine
+
+router = APIRouter(prefix="/monitor", tags=["运行监控"], dependencies=[Depends(require_permission("system:monitor"))])
+
+
+@router.get("/metrics")
+async def get_metrics():
+    """获取进程内运行指标。"""
+    return success(data={
+        "password_hasher": password_hasher.snapshot(),
+        "db_pool": pool_snapshot(engine),
+        "replicas": replica_router.snapshot(),
+        "slow_queries": slow_query_log.snapshot(),
+        "plugin_import_ms": plugin_engine.timings,
+        "plugin_bulkheads": plugin_engine.dispatcher.bulkhead_snapshot(),
+    })
+
+
+@router.get("/slow-queries")
+async def list_slow_queries(limit: int = Query(50, ge=1, le=1000)):
+    """最近的慢查询（含执行计划，新的在前）。"""
+    return success(data=slow_query_log.entries(limit))
+
+
+@router.delete("/slow-queries")
+async def clear_slow_queries():
+    """清空慢查询日志。"""
+    slow_query_log.clear()
+    return success(message="已清空")
@@ -3,16 +3,16 @@
 from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
 from app.core.response import success
-from app.core.security import get_current_user
+from app.core.permissions import require_permission
 from app.services.plugin_service import PluginService
 
-router = APIRouter(prefix="/plugins", tags=["插件管理"], dependencies=[Depends(get_current_user)])
+router = APIRouter(prefix="/plugins", tags=["插件管理"], dependencies=[Depends(require_permission("plugin:manage"))])
 
 
 @router.get("")
-async def list_plugins(db: AsyncSession = Depends(get_db)):
+async def list_plugins(db: AsyncSession = Depends(get_read_db)):
     """获取所有插件列表。"""
     plugins = await PluginService.get_list(db)
     return success(data=plugins)
@@ -23,3 +23,10 @@ async def toggle_plugin(plugin_name: str, db: AsyncSession = Depends(get_db)):
     """切换插件启用/禁用状态。"""
     result = await PluginService.toggle(db, plugin_name)
     return success(data=result, message="操作成功")
+
+
+@router.post("/{plugin_name}/reload")
+async def reload_plugin(plugin_name: str):
+    """热重载插件路由代码（无需重启进程）。"""
+    result = await PluginService.reload(plugin_name)
+    return success(data=result, message="重载成功")
@@ -5,70 +5,70 @@ from typing import Optional
 from fastapi import APIRouter, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
+from app.core.pagination import COUNT_MODE_PATTERN
 from app.core.response import page_response, success
+from app.core.permissions import require_permission
+from app.core.projection import rows_to_dicts
 from app.core.security import get_current_user
 from app.schemas.user import RoleCreate, RoleUpdate
+from app.services.projections import get_role_detail
 from app.services.role_service import RoleService
 
 router = APIRouter(prefix="/roles", tags=["角色管理"], dependencies=[Depends(get_current_user)])
 
 
-@router.get("")
+@router.get("", dependencies=[Depends(require_permission("role:read"))])
 async def list_roles(
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
     keyword: Optional[str] = None,
-    db: AsyncSession = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="游标分页：首页传空串，之后传 next_cursor"),
+    with_total: bool = True,
+    count: str = Query("exact", pattern=COUNT_MODE_PATTERN, description="总数统计方式：exact / cached / estimated"),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """分页查询角色列表。"""
-    roles, total = await RoleService.get_list(db, page=page, page_size=page_size, keyword=keyword)
-    items = [
-        {
-            "id": r.id,
-            "name": r.name,
-            "code": r.code,
-            "description": r.description,
-            "data_scope": r.data_scope,
-            "departments": [{"id": d.id, "name": d.name} for d in r.departments],
-            "created_at": r.created_at.isoformat() if r.created_at else None,
-        }
-        for r in roles
-    ]
-    return page_response(items=items, total=total, page=page, page_size=page_size)
+    result = await RoleService.get_list(
+        db,
+        page=page,
+        page_size=page_size,
+        keyword=keyword,
+        cursor=cursor,
+        with_total=with_total,
+        count_mode=count,
+    )
+    items = rows_to_dicts(result.items, json_lists=("departments",))
+    return page_response(
+        items=items,
+        total=result.total,
+        page=page,
+        page_size=page_size,
+        next_cursor=result.next_cursor,
+    )
 
 
-@router.get("/{role_id}")
-async def get_role(role_id: int, db: AsyncSession = Depends(get_db)):
+@router.get("/{role_id}", dependencies=[Depends(require_permission("role:read"))])
+async def get_role(role_id: int, db: AsyncSession = Depends(get_read_db)):
     """获取角色详情。"""
-    role = await RoleService.get_by_id(db, role_id)
-    return success(data={
-        "id": role.id,
-        "name": role.name,
-        "code": role.code,
-        "description": role.description,
-        "data_scope": role.data_scope,
-        "department_ids": [d.id for d in role.departments],
-        "permission_ids": [p.id for p in role.permissions],
-        "menu_ids": [m.id for m in role.menus],
-    })
+    return success(data=await get_role_detail(db, role_id))
 
 
-@router.post("")
+@router.post("", dependencies=[Depends(require_permission("role:manage"))])
 async def create_role(body: RoleCreate, db: AsyncSession = Depends(get_db)):
     """创建角色。"""
     role = await RoleService.create(db, body)
     return success(data={"id": role.id, "name": role.name}, message="创建成功")
 
 
-@router.put("/{role_id}")
+@router.put("/{role_id}", dependencies=[Depends(require_permission("role:manage"))])
 async def update_role(role_id: int, body: RoleUpdate, db: AsyncSession = Depends(get_db)):
     """更新角色。"""
     role = await RoleService.update(db, role_id, body)
     return success(data={"id": role.id}, message="更新成功")
 
 
-@router.delete("/{role_id}")
+@router.delete("/{role_id}", dependencies=[Depends(require_permission("role:manage"))])
 async def delete_role(role_id: int, db: AsyncSession = Depends(get_db)):
     """删除角色。"""
     await RoleService.delete(db, role_id)
@@ -2,75 +2,139 @@
 
 from typing import Optional
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, File, Query, UploadFile
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.core.data_scope import DataScope, get_data_scope
+from app.core.database import get_db, get_read_db
+from app.core.export import EXPORT_FORMAT_PATTERN, stream_export
+from app.core.pagination import COUNT_MODE_PATTERN
 from app.core.response import page_response, success
+from app.core.permissions import require_permission
+from app.core.projection import rows_to_dicts
 from app.core.security import get_current_user
-from app.models.user import User
+from app.models.user import Department, User
 from app.schemas.user import UserCreate, UserUpdate
+from app.services.user_import_service import FORMAT_CSV, FORMAT_NDJSON, UserImportService
+from app.services.projections import get_user_detail
 from app.services.user_service import UserService
 
 router = APIRouter(prefix="/users", tags=["用户管理"], dependencies=[Depends(get_current_user)])
 
 
-@router.get("")
+@router.get("", dependencies=[Depends(require_permission("user:read"))])
 async def list_users(
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
     keyword: Optional[str] = None,
     department_id: Optional[int] = None,
-    db: AsyncSession = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="游标分页：首页传空串，之后传 next_cursor"),
+    with_total: bool = True,
+    count: str = Query("exact", pattern=COUNT_MODE_PATTERN, description="总数统计方式：exact / cached / estimated"),
+    scope: DataScope = Depends(get_data_scope),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    """分页查询用户列表。"""
-    users, total = await UserService.get_list(
-        db, page=page, page_size=page_size, keyword=keyword, department_id=department_id
+    """分页查询用户列表（按数据权限过滤）。"""
+    result = await UserService.get_list(
+        db,
+        page=page,
+        page_size=page_size,
+        keyword=keyword,
+        department_id=department_id,
+        scope=scope,
+        cursor=cursor,
+        with_total=with_total,
+        count_mode=count,
+    )
+    items = rows_to_dicts(result.items, json_lists=("roles",))
+    return page_response(
+        items=items,
+        total=result.total,
+        page=page,
+        page_size=page_size,
+        next_cursor=result.next_cursor,
     )
-    items = [
-        {
-            "id": u.id,
-            "username": u.username,
-            "email": u.email,
-            "phone": u.phone,
-            "real_name": u.real_name,
-            "avatar": u.avatar,
-            "is_active": u.is_active,
-            "department_id": u.department_id,
-            "department_name": u.department.name if u.department else None,
-            "roles": [{"id": r.id, "name": r.name, "code": r.code} for r in u.roles],
-            "created_at": u.created_at.isoformat() if u.created_at else None,
-        }
-        for u in users
-    ]
-    return page_response(items=items, total=total, page=page, page_size=page_size)
-
-
-@router.get("/{user_id}")
-async def get_user(user_id: int, db: AsyncSession = Depends(get_db)):
+
+
+@router.get("/search")
+async def search_users(
+    keyword: str = Query(..., min_length=1, max_length=50),
+    limit: int = Query(20, ge=1, le=50),
+    department_id: Optional[int] = None,
+    scope: DataScope = Depends(get_data_scope),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """人员选择器搜索（审批人选择、转交等），仅返回数据权限内在职用户的基本信息。"""
+    items = await UserService.search(
+        db, keyword=keyword, limit=limit, department_id=department_id, scope=scope
+    )
+    return success(data=items)
+
+
+@router.get("/export", dependencies=[Depends(require_permission("user:read"))])
+async def export_users(
+    format: str = Query("csv", pattern=EXPORT_FORMAT_PATTERN),
+    department_id: Optional[int] = None,
+    is_active: Optional[bool] = None,
+    scope: DataScope = Depends(get_data_scope),
+):
+    """流式导出用户通讯录（按数据权限过滤）。"""
+    query = (
+        select(
+            User.id,
+            User.username,
+            User.real_name,
+            User.email,
+            User.phone,
+            User.department_id,
+            Department.name.label("department_name"),
+            User.is_active,
+            User.created_at,
+        )
+        .outerjoin(Department, Department.id == User.department_id)
+        .where(scope.filter(User.department_id, User.id))
+        .order_by(User.id)
+    )
+    if department_id:
+        query = query.where(User.department_id == department_id)
+    if is_active is not None:
+        query = query.where(User.is_active.is_(is_active))
+    return stream_export(query, format, "users")
+
+
+@router.get("/{user_id}", dependencies=[Depends(require_permission("user:read"))])
+async def get_user(user_id: int, db: AsyncSession = Depends(get_read_db)):
     """获取用户详情。"""
-    user = await UserService.get_by_id(db, user_id)
-    return success(data={
-        "id": user.id,
-        "username": user.username,
-        "email": user.email,
-        "phone": user.phone,
-        "real_name": user.real_name,
-        "avatar": user.avatar,
-        "is_active": user.is_active,
-        "department_id": user.department_id,
-        "roles": [{"id": r.id, "name": r.name, "code": r.code} for r in user.roles],
-    })
-
-
-@router.post("")
+    return success(data=await get_user_detail(db, user_id))
+
+
+@router.post("", dependencies=[Depends(require_permission("user:create"))])
 async def create_user(body: UserCreate, db: AsyncSession = Depends(get_db)):
     """创建用户。"""
     user = await UserService.create(db, body)
     return success(data={"id": user.id, "username": user.username}, message="创建成功")
 
 
-@router.put("/{user_id}")
+@router.post("/import", dependencies=[Depends(require_permission("user:create"))])
+async def import_users(
+    file: UploadFile = File(..., description="CSV（含表头）或 NDJSON 文件"),
+    format: Optional[str] = Query(None, pattern="^(csv|ndjson)$", description="默认按扩展名判断"),
+    db: AsyncSession = Depends(get_db),
+):
+    """批量导入用户，返回逐行错误报告。
+
+    列：username, password, real_name, email, phone, department_id 或 department（部门名称）,
+    roles（角色编码，``|`` 分隔）。
+    """
+    if format is None:
+        name = (file.filename or "").lower()
+        format = FORMAT_NDJSON if name.endswith((".ndjson", ".jsonl")) else FORMAT_CSV
+    report = await UserImportService(db).run(file.file, format)
+    return success(data=report, message="导入完成")
+
+
+@router.put("/{user_id}", dependencies=[Depends(require_permission("user:update"))])
 async def update_user(
     user_id: int, body: UserUpdate, db: AsyncSession = Depends(get_db)
 ):
@@ -79,7 +143,7 @@ async def update_user(
     return success(data={"id": user.id}, message="更新成功")
 
 
-@router.delete("/{user_id}")
+@router.delete("/{user_id}", dependencies=[Depends(require_permission("user:delete"))])
 async def delete_user(user_id: int, db: AsyncSession = Depends(get_db)):
     """删除用户。"""
     await UserService.delete(db, user_id)
@@ -0,0 +1,211 @@
+"""插件舱壁隔离 — 按 manifest ``limits`` 限制并发、超时与数据库连接占用。
+
+``manifest.json`` 示例::
+
+    "limits": {
+        "maxConcurrency": 50,      // 同时处理的请求数
+        "maxQueue": 100,           // 超出并发后允许排队的请求数，再多直接 503
+        "timeoutSeconds": 30,      // 单个请求在发出响应头之前的最长耗时，超时 504
+        "maxDbConnections": 10,    // 同时持有的数据库会话数（共享连接池中的份额）
+        "dbWaitSeconds": 5         // 等待数据库份额的最长时间，超时 503
+    }
+
+未声明的项不限制。每个插件一个 :class:`Bulkhead`，由插件分发器在调用插件路由前
+进入；``get_db`` / ``get_read_db`` 通过 :func:`db_slot` 占用当前插件的数据库份额，
+使单个插件无法耗尽共享连接池。份额按请求计：同一请求内嵌套的多个会话（如读会话
+与写会话同时存在）只占一份，最后一个会话关闭时归还。认证依赖的会话不计入份额。
+饱和、超时等指标见 ``/api/v1/monitor/metrics``。
+"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.exceptions import AppException
+from app.core.metrics import LatencyStats
+from app.core.response import FastJSONResponse, error
+
+
+class BulkheadLimits:
+    """插件资源上限（None 表示不限制）。"""
+
+    def __init__(
+        self,
+        max_concurrency: Optional[int] = None,
+        max_queue: int = 0,
+        timeout_seconds: Optional[float] = None,
+        max_db_connections: Optional[int] = None,
+        db_wait_seconds: float = 5.0,
+    ):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.timeout_seconds = timeout_seconds
+        self.max_db_connections = max_db_connections
+        self.db_wait_seconds = db_wait_seconds
+
+    @classmethod
+    def from_manifest(cls, data: dict) -> "BulkheadLimits":
+        """从 manifest 的 ``limits`` 解析。"""
+        return cls(
+            max_concurrency=data.get("maxConcurrency"),
+            max_queue=data.get("maxQueue", 0),
+            timeout_seconds=data.get("timeoutSeconds"),
+            max_db_connections=data.get("maxDbConnections"),
+            db_wait_seconds=data.get("dbWaitSeconds", 5.0),
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "maxConcurrency": self.max_concurrency,
+            "maxQueue": self.max_queue,
+            "timeoutSeconds": self.timeout_seconds,
+            "maxDbConnections": self.max_db_connections,
+            "dbWaitSeconds": self.db_wait_seconds,
+        }
+
+
+class _RequestSlot:
+    """单个插件请求的数据库份额（可重入计数）。"""
+
+    __slots__ = ("bulkhead", "depth")
+
+    def __init__(self, bulkhead: "Bulkhead"):
+        self.bulkhead = bulkhead
+        self.depth = 0
+
+
+_request_slot: ContextVar[Optional[_RequestSlot]] = ContextVar("bulkhead_slot", default=None)
+
+
+class Bulkhead:
+    """单个插件的舱壁。"""
+
+    def __init__(self, name: str, limits: BulkheadLimits):
+        self.name = name
+        self.limits = limits
+        self._slots = asyncio.Semaphore(limits.max_concurrency) if limits.max_concurrency else None
+        self._db_slots = asyncio.Semaphore(limits.max_db_connections) if limits.max_db_connections else None
+        self.active = 0
+        self.waiting = 0
+        self.peak_active = 0
+        self.db_active = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.db_rejected = 0
+        self.latency = LatencyStats()
+
+    async def __call__(self, app: ASGIApp, scope: Scope, receive: Receive, send: Send) -> None:
+        """在舱壁限制内执行插件的 ASGI 应用。"""
+        if self._slots is not None and self._slots.locked() and self.waiting >= self.limits.max_queue:
+            self.rejected += 1
+            await self._reject(scope, receive, send, 503, f"插件 {self.name} 繁忙，请稍后重试")
+            return
+
+        started = time.perf_counter()
+        response_started = False
+
+        async def send_tracking(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start" and not response_started:
+                response_started = True
+                # 响应头已发出，流式响应体不受超时限制
+                timeout.reschedule(None)
+            await send(message)
+
+        token = _request_slot.set(_RequestSlot(self))
+        try:
+            async with asyncio.timeout(self.limits.timeout_seconds) as timeout:
+                await self._acquire()
+                try:
+                    await app(scope, receive, send_tracking)
+                finally:
+                    self._release()
+        except TimeoutError:
+            # 插件内部抛出的 TimeoutError（如数据库连接超时）不属于舱壁超时，原样抛出
+            if not timeout.expired():
+                raise
+            self.timeouts += 1
+            if not response_started:
+                await self._reject(scope, receive, send, 504, f"插件 {self.name} 请求超时")
+        finally:
+            _request_slot.reset(token)
+            self.latency.record(time.perf_counter() - started)
+
+    async def _acquire(self) -> None:
+        if self._slots is None:
+            self._enter()
+            return
+        self.waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+        self._enter()
+
+    def _enter(self) -> None:
+        self.active += 1
+        self.peak_active = max(self.peak_active, self.active)
+
+    def _release(self) -> None:
+        self.active -= 1
+        if self._slots is not None:
+            self._slots.release()
+
+    @staticmethod
+    async def _reject(scope: Scope, receive: Receive, send: Send, status: int, message: str) -> None:
+        if scope["type"] != "http":
+            await send({"type": "websocket.close", "code": 1013})
+            return
+        response = FastJSONResponse(error(status, message), status_code=status, headers={"Retry-After": "1"})
+        await response(scope, receive, send)
+
+    async def _acquire_db(self) -> None:
+        """占用一个数据库份额，等待超过 ``dbWaitSeconds`` 时返回 503。"""
+        try:
+            await asyncio.wait_for(self._db_slots.acquire(), self.limits.db_wait_seconds)
+        except TimeoutError:
+            self.db_rejected += 1
+            raise AppException(code=503, message=f"插件 {self.name} 数据库连接繁忙，请稍后重试")
+        self.db_active += 1
+
+    def _release_db(self) -> None:
+        self.db_active -= 1
+        self._db_slots.release()
+
+    def snapshot(self) -> dict:
+        """导出饱和度指标。"""
+        limits = self.limits
+        return {
+            "limits": limits.to_dict(),
+            "active": self.active,
+            "waiting": self.waiting,
+            "peak_active": self.peak_active,
+            "saturation": round(self.active / limits.max_concurrency, 3) if limits.max_concurrency else None,
+            "db_active": self.db_active,
+            "rejected": self.rejected,
+            "timeouts": self.timeouts,
+            "db_rejected": self.db_rejected,
+            "latency": self.latency.snapshot(),
+        }
+
+
+@asynccontextmanager
+async def db_slot() -> AsyncIterator[None]:
+    """在当前插件请求的数据库份额内执行（非插件请求不受限制；同一请求内可重入）。"""
+    slot = _request_slot.get()
+    if slot is None or slot.bulkhead._db_slots is None:
+        yield
+        return
+    if slot.depth == 0:
+        await slot.bulkhead._acquire_db()
+    slot.depth += 1
+    try:
+        yield
+    finally:
+        slot.depth -= 1
+        if slot.depth == 0:
+            slot.bulkhead._release_db()
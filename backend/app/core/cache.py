@@ -0,0 +1,162 @@
+"""缓存工具 — 进程内 TTL/LRU 缓存 + 可选 Redis 二级缓存。
+
+使用示例::
+
+    cache = TieredCache("principal", maxsize=10000, ttl=60)
+    await cache.set(1, {"id": 1})
+    await cache.get(1)
+    await cache.delete(1)
+
+Redis 层仅在 ``REDIS_ENABLED=true`` 时启用，连接异常时自动降级为纯进程内缓存。
+"""
+
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+_MISSING = object()
+
+_redis_client = None
+
+
+def get_redis():
+    """获取全局 Redis 异步客户端；未启用 Redis 时返回 None。"""
+    global _redis_client
+    if not settings.redis_enabled:
+        return None
+    if _redis_client is None:
+        import redis.asyncio as aioredis
+
+        _redis_client = aioredis.from_url(settings.redis_url, decode_responses=True)
+    return _redis_client
+
+
+async def close_redis() -> None:
+    """关闭全局 Redis 客户端（应用关闭时调用）。"""
+    global _redis_client
+    if _redis_client is not None:
+        await _redis_client.aclose()
+        _redis_client = None
+
+
+class TTLCache:
+    """进程内 TTL + LRU 缓存。
+
+    仅在事件循环线程中使用，因此无需加锁。超出容量时淘汰最久未访问的条目。
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """读取缓存，过期条目视为不存在。"""
+        item = self._data.get(key, _MISSING)
+        if item is _MISSING:
+            return default
+        expires_at, value = item
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return default
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """写入缓存。"""
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        """删除单个条目。"""
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """清空缓存。"""
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class TieredCache:
+    """两级缓存：进程内 TTLCache 为一级，Redis 为可选二级。
+
+    ``encoder`` / ``decoder`` 用于在写入 Redis 前后转换值（默认要求值可 JSON 序列化）。
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        maxsize: int = 1024,
+        ttl: float = 60.0,
+        encoder: Optional[Callable[[Any], Any]] = None,
+        decoder: Optional[Callable[[Any], Any]] = None,
+    ):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.local = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._encoder = encoder or (lambda v: v)
+        self._decoder = decoder or (lambda v: v)
+
+    def _redis_key(self, key: Hashable) -> str:
+        return f"oa:{self.namespace}:{key}"
+
+    async def get(self, key: Hashable) -> Any:
+        """依次查询本地与 Redis，命中 Redis 时回填本地。未命中返回 None。"""
+        value = self.local.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        client = get_redis()
+        if client is None:
+            return None
+        try:
+            raw = await client.get(self._redis_key(key))
+        except Exception as e:
+            logger.warning("读取 Redis 缓存失败 (%s): %s", self.namespace, e)
+            return None
+        if raw is None:
+            return None
+
+        value = self._decoder(json.loads(raw))
+        self.local.set(key, value)
+        return value
+
+    async def set(self, key: Hashable, value: Any) -> None:
+        """同时写入本地与 Redis。"""
+        self.local.set(key, value)
+        client = get_redis()
+        if client is None:
+            return
+        try:
+            raw = json.dumps(self._encoder(value), ensure_ascii=False, default=str)
+            await client.set(self._redis_key(key), raw, ex=int(self.ttl))
+        except Exception as e:
+            logger.warning("写入 Redis 缓存失败 (%s): %s", self.namespace, e)
+
+    async def delete(self, key: Hashable) -> None:
+        """同时从本地与 Redis 删除。"""
+        self.local.delete(key)
+        client = get_redis()
+        if client is None:
+            return
+        try:
+            await client.delete(self._redis_key(key))
+        except Exception as e:
+            logger.warning("删除 Redis 缓存失败 (%s): %s", self.namespace, e)
+
+    def clear_local(self) -> None:
+        """清空本地一级缓存。"""
+        self.local.clear()
@@ -0,0 +1,207 @@
+"""数据权限（``Role.data_scope``）编译器。
+
+把用户全部角色的数据范围合并为一个 SQLAlchemy 过滤条件，直接拼入列表查询：
+
+- ``all``：不过滤
+- ``dept`` / ``department``：本部门及下级部门（闭包表子查询）
+- ``dept_custom`` / ``custom``：角色关联的自定义部门集合
+- ``self``：仅本人数据
+
+多个角色取并集；无论哪种范围，本人数据始终可见。编译结果按 (用户, 授权代数)
+缓存，请求期间不额外访问数据库。未启用 Redis 事件中继时，其它 worker 上的角色
+变更由 :mod:`app.core.state_poller` 定期重新加载发现。
+
+使用示例::
+
+    @router.get("")
+    async def list_users(scope: DataScope = Depends(get_data_scope), ...):
+        users, total = await UserService.get_list(db, scope=scope)
+"""
+
+import logging
+from typing import Optional
+
+from fastapi import Depends
+from sqlalchemy import ColumnElement, false, or_, select, true
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import TTLCache
+from app.core.database import async_session_factory
+from app.core.event_bus import event_bus
+from app.core.permissions import auth_generation
+from app.core.security import get_current_user
+from app.core.state_poller import state_poller
+from app.schemas.auth import Principal
+
+logger = logging.getLogger(__name__)
+
+SCOPE_ALL = "all"
+SCOPE_DEPT = frozenset({"dept", "department"})
+SCOPE_CUSTOM = frozenset({"dept_custom", "custom"})
+
+
+class DataScope:
+    """编译后的用户数据范围。"""
+
+    def __init__(
+        self,
+        user_id: int,
+        see_all: bool = False,
+        own_department_id: Optional[int] = None,
+        department_ids: frozenset[int] = frozenset(),
+    ):
+        self.user_id = user_id
+        self.see_all = see_all
+        self.own_department_id = own_department_id
+        self.department_ids = department_ids
+
+    def filter(
+        self,
+        department_column: Optional[ColumnElement] = None,
+        owner_column: Optional[ColumnElement] = None,
+    ) -> ColumnElement:
+        """生成过滤条件。
+
+        :param department_column: 数据所属部门列（如 ``User.department_id``）
+        :param owner_column: 数据所属用户列（如 ``WorkflowInstance.initiator_id``）
+        """
+        if self.see_all:
+            return true()
+
+        from app.models.user import department_closure
+
+        clauses = []
+        if owner_column is not None:
+            clauses.append(owner_column == self.user_id)
+        if department_column is not None:
+            if self.own_department_id is not None:
+                clauses.append(
+                    department_column.in_(
+                        select(department_closure.c.descendant_id).where(
+                            department_closure.c.ancestor_id == self.own_department_id
+                        )
+                    )
+                )
+            if self.department_ids:
+                clauses.append(department_column.in_(sorted(self.department_ids)))
+        return or_(*clauses) if clauses else false()
+
+
+class DataScopeCompiler:
+    """角色数据范围注册表，负责把用户的角色编译为 :class:`DataScope`。"""
+
+    def __init__(self):
+        # role_id -> (data_scope, 自定义部门 ID 集合)
+        self._roles: dict[int, tuple[str, frozenset[int]]] = {}
+        self._compiled = TTLCache(maxsize=10000, ttl=600)
+
+    async def load(self, db: AsyncSession) -> bool:
+        """从数据库全量加载角色数据范围，返回是否有变化。"""
+        from app.models.user import Role, role_departments
+
+        rows = await db.execute(
+            select(Role.id, Role.data_scope, role_departments.c.department_id)
+            .select_from(Role)
+            .outerjoin(role_departments, role_departments.c.role_id == Role.id)
+        )
+        grouped: dict[int, tuple[str, set[int]]] = {}
+        for role_id, data_scope, dept_id in rows.all():
+            entry = grouped.setdefault(role_id, (data_scope or "self", set()))
+            if dept_id is not None:
+                entry[1].add(dept_id)
+
+        roles = {rid: (scope, frozenset(ids)) for rid, (scope, ids) in grouped.items()}
+        if roles == self._roles:
+            return False
+        self._roles = roles
+        self._compiled.clear()
+        logger.info("数据权限已加载: %d 个角色", len(self._roles))
+        return True
+
+    async def rebuild_role(self, db: AsyncSession, role_id: int) -> None:
+        """从数据库重新加载单个角色。"""
+        from app.models.user import Role, role_departments
+
+        data_scope = await db.scalar(select(Role.data_scope).where(Role.id == role_id))
+        if data_scope is None:
+            self.drop_role(role_id)
+            return
+        dept_ids = (
+            await db.execute(
+                select(role_departments.c.department_id).where(
+                    role_departments.c.role_id == role_id
+                )
+            )
+        ).scalars().all()
+        self._roles[role_id] = (data_scope, frozenset(dept_ids))
+        self._compiled.clear()
+
+    def drop_role(self, role_id: int) -> None:
+        """移除角色。"""
+        self._roles.pop(role_id, None)
+        self._compiled.clear()
+
+    def compile(self, principal: Principal) -> DataScope:
+        """把用户的全部角色合并为一个 DataScope（按用户与授权代数缓存）。"""
+        key = (
+            principal.id,
+            auth_generation.value,
+            principal.department_id,
+            tuple(principal.role_ids),
+        )
+        scope = self._compiled.get(key)
+        if scope is not None:
+            return scope
+
+        see_all = False
+        own_department = False
+        department_ids: set[int] = set()
+        for role_id in principal.role_ids:
+            data_scope, custom_ids = self._roles.get(role_id, ("self", frozenset()))
+            if data_scope == SCOPE_ALL:
+                see_all = True
+                break
+            if data_scope in SCOPE_DEPT:
+                own_department = True
+            elif data_scope in SCOPE_CUSTOM:
+                department_ids |= custom_ids
+
+        scope = DataScope(
+            user_id=principal.id,
+            see_all=see_all,
+            own_department_id=principal.department_id if own_department else None,
+            department_ids=frozenset(department_ids),
+        )
+        self._compiled.set(key, scope)
+        return scope
+
+
+# 全局数据权限编译器单例
+data_scope_compiler = DataScopeCompiler()
+
+
+async def _on_role_changed(_: str, data: dict) -> None:
+    """角色创建/更新后重新加载其数据范围。"""
+    async with async_session_factory() as db:
+        await data_scope_compiler.rebuild_role(db, int(data["id"]))
+
+
+async def _on_role_deleted(_: str, data: dict) -> None:
+    """角色删除后移除其数据范围。"""
+    data_scope_compiler.drop_role(int(data["id"]))
+
+
+async def _refresh_data_scopes(db: AsyncSession) -> None:
+    """轮询兜底：重新加载全部角色数据范围（有变化时清空编译缓存）。"""
+    await data_scope_compiler.load(db)
+
+
+event_bus.subscribe("role.created", _on_role_changed)
+event_bus.subscribe("role.updated", _on_role_changed)
+event_bus.subscribe("role.deleted", _on_role_deleted)
+state_poller.register("data_scopes", _refresh_data_scopes)
+
+
+async def get_data_scope(current_user: Principal = Depends(get_current_user)) -> DataScope:
+    """FastAPI 依赖：获取当前用户编译后的数据范围。"""
+    return data_scope_compiler.compile(current_user)
@@ -1,21 +1,29 @@
 """异步数据库引擎和会话管理。"""
 
+from itertools import chain
+from typing import Any
+
+from fastapi import Request
+from sqlalchemy import event, inspect
 from sqlalchemy.ext.asyncio import (
     AsyncSession,
     async_sessionmaker,
     create_async_engine,
 )
+from sqlalchemy.orm import ORMExecuteState, Session
 
+from app.core.bulkhead import db_slot
 from app.core.config import get_settings
+from app.core.db_pool import engine_options
+from app.core.db_router import ReplicaRouter, request_subject
+from app.core.event_bus import event_bus
+from app.core.slow_query import slow_query_log
 
 settings = get_settings()
 
 engine = create_async_engine(
     settings.database_url,
-    echo=settings.app_env == "development",
-    pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20,
+    **engine_options(settings, settings.database_url),
 )
 
 async_session_factory = async_sessionmaker(
@@ -24,13 +32,120 @@ async_session_factory = async_sessionmaker(
     expire_on_commit=False,
 )
 
+# 主库的只读视图：AUTOCOMMIT 模式下不发送 BEGIN / COMMIT，与主库共用连接池
+read_engine = engine.execution_options(isolation_level="AUTOCOMMIT")
+
+# 只读副本路由（未配置 DATABASE_REPLICA_URLS 时始终返回 read_engine）
+replica_router = ReplicaRouter(
+    read_engine,
+    settings.database_replica_url_list,
+    engine_options_for=lambda url: engine_options(settings, url),
+    health_interval=settings.replica_health_interval,
+    max_lag=settings.replica_max_lag_seconds,
+    read_after_write=settings.replica_read_after_write_seconds,
+)
+
+# 慢查询日志：主库与各只读副本
+for _engine in (engine, *replica_router.replicas):
+    slow_query_log.attach(_engine)
+
+read_session_factory = async_sessionmaker(
+    read_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+    autoflush=False,
+    info={"read_only": True},
+)
+
+
+@event.listens_for(Session, "before_flush")
+def _reject_read_only_flush(session: Session, *_) -> None:
+    """只读会话禁止写入 ORM 变更。"""
+    if session.info.get("read_only"):
+        raise RuntimeError("只读会话不允许写入，请改用 get_db")
+
+
+@event.listens_for(Session, "after_flush")
+def _track_written_tables(session: Session, _) -> None:
+    """记录本事务中 ORM 写入过的表名（含多对多关联表），提交后统一广播 ``db.tables_changed``。"""
+    tables = session.info.setdefault("written_tables", set())
+    for obj in chain(session.new, session.dirty, session.deleted):
+        table = getattr(obj, "__table__", None)
+        if table is None:
+            continue
+        tables.add(table.name)
+        state = inspect(obj)
+        for rel in state.mapper.relationships:
+            if rel.secondary is not None and state.attrs[rel.key].history.has_changes():
+                tables.add(rel.secondary.name)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_statement_writes(orm_execute_state: ORMExecuteState) -> None:
+    """记录经 ``session.execute`` 执行的 insert / update / delete 语句写入的表。"""
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        table = getattr(orm_execute_state.statement, "table", None)
+        name = getattr(table, "name", None)
+        if name:
+            orm_execute_state.session.info.setdefault("written_tables", set()).add(name)
+
 
-async def get_db() -> AsyncSession:
-    """FastAPI 依赖注入：获取数据库会话。"""
-    async with async_session_factory() as session:
+def mark_tables_written(session: AsyncSession, *tables: str) -> None:
+    """登记未经 ``session.execute`` 的写入（如 ``connection.execute``）涉及的表，提交后一并广播。"""
+    session.info.setdefault("written_tables", set()).update(tables)
+
+
+def publish_after_commit(session: AsyncSession, event: str, data: Any = None) -> None:
+    """登记一个在事务提交成功后才广播的事件（如缓存失效通知）。
+
+    在提交前失效缓存会让并发请求把旧数据重新写回缓存，因此统一延后到提交之后。
+    """
+    session.info.setdefault("pending_events", []).append((event, data))
+
+
+async def dispatch_pending_events(session: AsyncSession) -> None:
+    """广播会话上登记的全部待发事件。"""
+    pending = session.info.pop("pending_events", None)
+    for name, data in pending or []:
+        await event_bus.broadcast(name, data)
+
+    tables = session.info.pop("written_tables", None)
+    if tables:
+        await event_bus.broadcast("db.tables_changed", {"tables": sorted(tables)})
+
+
+async def get_db(request: Request) -> AsyncSession:
+    """FastAPI 依赖注入：获取数据库会话（插件请求计入该插件的数据库份额）。"""
+    async with db_slot(), async_session_factory() as session:
         try:
             yield session
             await session.commit()
         except Exception:
             await session.rollback()
+            session.info.pop("pending_events", None)
+            session.info.pop("written_tables", None)
             raise
+        if session.info.get("written_tables") or session.info.get("pending_events"):
+            await replica_router.record_write(request_subject(request))
+        await dispatch_pending_events(session)
+
+
+async def get_read_db(request: Request) -> AsyncSession:
+    """FastAPI 依赖注入：获取只读数据库会话。
+
+    用于纯查询接口：不开启事务、不提交，配置了副本时路由到副本（当前用户刚写入过
+    则读主库）。会话内的 ORM 写入会被拒绝。
+    """
+    bind = await replica_router.engine_for(request_subject(request))
+    async with db_slot(), read_session_factory(bind=bind) as session:
+        yield session
+
+
+async def get_primary_read_db() -> AsyncSession:
+    """FastAPI 依赖注入：获取读主库的只读会话。
+
+    供回填失效驱动缓存的读取使用（当前用户、``/auth/me``、部门与菜单树）：副本可能落后
+    ``REPLICA_MAX_LAG_SECONDS``，失效后从副本读到的旧数据会被缓存整个 TTL。
+    """
+    async with db_slot(), read_session_factory() as session:
+        yield session
@@ -0,0 +1,100 @@
+"""数据库连接池配置与指标。
+
+连接池参数全部来自 ``Settings``（``DATABASE_POOL_*``），主库与只读副本共用：
+
+- ``DATABASE_POOL_SIZE`` / ``DATABASE_MAX_OVERFLOW``：常驻连接数 / 峰值额外连接数
+- ``DATABASE_POOL_TIMEOUT``：池满时等待连接的秒数，超时抛出 ``TimeoutError``
+- ``DATABASE_POOL_RECYCLE``：连接最长存活秒数（-1 不回收），应小于数据库 / 代理的空闲断开时间
+- ``DATABASE_POOL_PRE_PING``：取出连接前先探活
+- ``DATABASE_PGBOUNCER``：经 PgBouncer 事务池连接时开启，关闭 asyncpg 预编译语句缓存
+  并使用随机语句名（同一会话的语句可能落在不同的服务端连接上）
+
+每个 worker 进程各有一套连接池，数据库侧的最大连接数约为
+``worker 数 × (POOL_SIZE + MAX_OVERFLOW)``。``GET /api/v1/monitor/metrics`` 中的
+``db_pool`` 给出当前进程的占用与取连接等待时间，可据此调整参数。
+"""
+
+import logging
+import os
+import time
+from typing import Any
+from uuid import uuid4
+
+from sqlalchemy import exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.core.config import Settings
+from app.core.metrics import LatencyStats
+
+# 连接池实例日志器以类的模块路径命名，不在 "sqlalchemy" 日志树下；与 SQLAlchemy 默认一致只输出 WARNING
+logging.getLogger(f"{__name__}.TimedAsyncQueuePool").setLevel(logging.WARNING)
+
+
+class TimedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """记录取连接耗时（含排队等待与新建连接）与超时次数的连接池。"""
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.wait = LatencyStats()
+        self.timeouts = 0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            self.wait.record(time.perf_counter() - started)
+
+
+def _unique_statement_name() -> str:
+    """PgBouncer 事务池下的预编译语句名，避免不同客户端连接间重名。"""
+    return f"__asyncpg_{uuid4()}__"
+
+
+def engine_options(settings: Settings, url: str) -> dict:
+    """构造 ``create_async_engine`` 的连接池参数。"""
+    options: dict[str, Any] = {
+        "echo": settings.database_echo,
+        "pool_pre_ping": settings.database_pool_pre_ping,
+    }
+    backend = make_url(url)
+    # SQLite 内存库只能使用单连接的 StaticPool
+    if backend.get_backend_name() == "sqlite" and backend.database in (None, "", ":memory:"):
+        return options
+
+    options.update(
+        poolclass=TimedAsyncQueuePool,
+        pool_size=settings.database_pool_size,
+        max_overflow=settings.database_max_overflow,
+        pool_timeout=settings.database_pool_timeout,
+        pool_recycle=settings.database_pool_recycle,
+    )
+    if settings.database_pgbouncer and backend.get_driver_name() == "asyncpg":
+        options["connect_args"] = {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": _unique_statement_name,
+        }
+    return options
+
+
+def pool_snapshot(engine: AsyncEngine) -> dict:
+    """导出连接池占用与等待指标（当前进程）。"""
+    pool = engine.sync_engine.pool
+    data: dict[str, Any] = {"pid": os.getpid(), "pool": type(pool).__name__}
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        data.update(
+            size=pool.size(),
+            max_overflow=pool._max_overflow,
+            checked_out=pool.checkedout(),
+            checked_in=pool.checkedin(),
+            overflow=max(0, pool.overflow()),
+        )
+    if isinstance(pool, TimedAsyncQueuePool):
+        data.update(timeouts=pool.timeouts, wait=pool.wait.snapshot())
+    return data
@@ -0,0 +1,169 @@
+"""只读副本路由。
+
+``get_read_db`` 的会话按以下规则选择引擎：
+
+1. 用户在最近 ``REPLICA_READ_AFTER_WRITE_SECONDS`` 秒内有过写入 → 主库（读己之写）
+2. 否则在健康的副本间轮询
+3. 没有配置副本或全部不健康 → 主库
+
+后台任务定期探测每个副本：连接失败或复制延迟超过 ``REPLICA_MAX_LAG_SECONDS``
+即摘除，恢复后自动加回。"最近写入"记录在 :class:`TieredCache` 中，启用 Redis
+时多个 worker 共享。
+"""
+
+import asyncio
+import itertools
+import logging
+from typing import Callable, Optional
+
+from fastapi import Request
+from jose import JWTError, jwt
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from app.core.cache import TieredCache
+from app.core.db_pool import pool_snapshot
+
+logger = logging.getLogger(__name__)
+
+# PostgreSQL 副本的复制延迟（秒）：已回放完收到的 WAL 视为 0（主库空闲时不误报）；
+# 主库上返回 NULL
+_LAG_SQL = text(
+    "SELECT CASE "
+    "WHEN NOT pg_is_in_recovery() THEN NULL "
+    "WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) "
+    "END"
+)
+
+
+def request_subject(request: Request) -> Optional[str]:
+    """从 Bearer Token 中取出用户标识（``sub``）。
+
+    仅用于选择读库，不做签名校验——伪造只会让请求读主库，鉴权仍由
+    ``get_current_user`` 负责。
+    """
+    header = request.headers.get("authorization", "")
+    scheme, _, token = header.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        sub = jwt.get_unverified_claims(token).get("sub")
+    except JWTError:
+        return None
+    return str(sub) if sub is not None else None
+
+
+class ReplicaRouter:
+    """只读副本选择器。"""
+
+    def __init__(
+        self,
+        primary: AsyncEngine,
+        replica_urls: list[str],
+        engine_options_for: Optional[Callable[[str], dict]] = None,
+        health_interval: float = 5.0,
+        max_lag: float = 10.0,
+        read_after_write: float = 5.0,
+    ):
+        self.primary = primary
+        options_for = engine_options_for or (lambda url: {})
+        self.replicas = [
+            create_async_engine(url, isolation_level="AUTOCOMMIT", **options_for(url))
+            for url in replica_urls
+        ]
+        self.health_interval = health_interval
+        self.max_lag = max_lag
+        self.read_after_write = read_after_write
+        self._healthy = [True] * len(self.replicas)
+        self._lag: list[Optional[float]] = [None] * len(self.replicas)
+        self._round_robin = itertools.count()
+        self._recent_writers = TieredCache("recent_write", maxsize=100000, ttl=read_after_write)
+        self._task: Optional[asyncio.Task] = None
+
+    def engine(self) -> AsyncEngine:
+        """轮询选择一个健康副本，没有可用副本时返回主库。"""
+        healthy = [e for e, ok in zip(self.replicas, self._healthy) if ok]
+        if not healthy:
+            return self.primary
+        return healthy[next(self._round_robin) % len(healthy)]
+
+    async def engine_for(self, subject: Optional[str]) -> AsyncEngine:
+        """为某用户的只读请求选择引擎（最近写入过的用户读主库）。"""
+        if not self.replicas:
+            return self.primary
+        if subject and self.read_after_write > 0:
+            if await self._recent_writers.get(subject):
+                return self.primary
+        return self.engine()
+
+    async def record_write(self, subject: Optional[str]) -> None:
+        """记录用户刚刚提交了写入。"""
+        if self.replicas and subject and self.read_after_write > 0:
+            await self._recent_writers.set(subject, 1)
+
+    async def check(self) -> None:
+        """探测全部副本的连通性与复制延迟。"""
+        for i, replica in enumerate(self.replicas):
+            try:
+                async with replica.connect() as conn:
+                    lag = None
+                    if replica.dialect.name == "postgresql":
+                        lag = await conn.scalar(_LAG_SQL)
+                    else:
+                        await conn.execute(text("SELECT 1"))
+                self._lag[i] = None if lag is None else round(float(lag), 3)
+                healthy = lag is None or float(lag) <= self.max_lag
+                if not healthy:
+                    logger.warning("只读副本 %s 复制延迟 %.1f 秒，超过阈值", self._name(i), lag)
+            except Exception as e:
+                healthy = False
+                logger.warning("只读副本 %s 探测失败: %s", self._name(i), e)
+
+            if healthy != self._healthy[i]:
+                logger.warning("只读副本 %s %s", self._name(i), "恢复可用" if healthy else "已摘除")
+            self._healthy[i] = healthy
+
+    async def _loop(self) -> None:
+        """定期健康检查。"""
+        while True:
+            await self.check()
+            await asyncio.sleep(self.health_interval)
+
+    async def start(self) -> None:
+        """启动后台健康检查（未配置副本时不做任何事）。"""
+        if self.replicas and self._task is None:
+            self._task = asyncio.create_task(self._loop())
+            logger.info("只读副本路由已启用: %d 个副本", len(self.replicas))
+
+    async def stop(self) -> None:
+        """停止健康检查并释放副本连接池。"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for replica in self.replicas:
+            await replica.dispose()
+
+    def _name(self, index: int) -> str:
+        """隐藏密码的副本地址。"""
+        return make_url(self.replicas[index].url).render_as_string(hide_password=True)
+
+    def snapshot(self) -> dict:
+        """导出副本状态（监控用）。"""
+        return {
+            "read_after_write_seconds": self.read_after_write,
+            "replicas": [
+                {
+                    "url": self._name(i),
+                    "healthy": self._healthy[i],
+                    "lag_seconds": self._lag[i],
+                    "pool": pool_snapshot(self.replicas[i]),
+                }
+                for i in range(len(self.replicas))
+            ],
+        }
@@ -4,8 +4,13 @@
 """
 
 import asyncio
+import json
+import logging
+import uuid
 from collections import defaultdict
-from typing import Any, Callable, Coroutine
+from typing import Any, Callable, Coroutine, Optional
+
+logger = logging.getLogger(__name__)
 
 # 事件处理器类型：接收事件名称和数据
 EventHandler = Callable[[str, Any], Coroutine[Any, Any, None]]
@@ -27,6 +32,7 @@ class EventBus:
 
     def __init__(self):
         self._handlers: dict[str, list[EventHandler]] = defaultdict(list)
+        self.relay: Optional["RedisEventRelay"] = None
 
     def subscribe(self, event: str, handler: EventHandler) -> None:
         """订阅事件。"""
@@ -48,10 +54,85 @@ class EventBus:
                 return_exceptions=True,
             )
 
+    async def broadcast(self, event: str, data: Any = None) -> None:
+        """发布事件，并在启用 Redis 中继时同步转发给其它 worker。
+
+        用于缓存失效等需要所有进程感知的状态变更，``data`` 必须可 JSON 序列化。
+        """
+        await self.publish(event, data)
+        if self.relay is not None:
+            await self.relay.send(event, data)
+
     def clear(self) -> None:
         """清除所有事件订阅。"""
         self._handlers.clear()
 
 
+class RedisEventRelay:
+    """基于 Redis pub/sub 的跨 worker 事件中继。
+
+    本进程 ``broadcast`` 的事件写入频道，其它进程收到后在本地 ``publish``；
+    通过 origin 标识忽略自己发出的消息，避免重复处理。
+    """
+
+    CHANNEL = "oa:events"
+
+    def __init__(self, bus: EventBus, redis_client):
+        self._bus = bus
+        self._redis = redis_client
+        self._origin = uuid.uuid4().hex
+        self._task: Optional[asyncio.Task] = None
+
+    async def send(self, event: str, data: Any) -> None:
+        """将事件写入 Redis 频道。"""
+        try:
+            message = json.dumps(
+                {"origin": self._origin, "event": event, "data": data},
+                ensure_ascii=False,
+                default=str,
+            )
+            await self._redis.publish(self.CHANNEL, message)
+        except Exception as e:
+            logger.warning("事件 %s 转发到 Redis 失败: %s", event, e)
+
+    async def start(self) -> None:
+        """开始监听频道，并挂载到事件总线。"""
+        pubsub = self._redis.pubsub()
+        await pubsub.subscribe(self.CHANNEL)
+        self._task = asyncio.create_task(self._listen(pubsub))
+        self._bus.relay = self
+
+    async def stop(self) -> None:
+        """停止监听并从事件总线卸载。"""
+        self._bus.relay = None
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _listen(self, pubsub) -> None:
+        """消费频道消息并在本地重放。"""
+        try:
+            async for message in pubsub.listen():
+                if message.get("type") != "message":
+                    continue
+                try:
+                    payload = json.loads(message["data"])
+                except (TypeError, ValueError):
+                    continue
+                if payload.get("origin") == self._origin:
+                    continue
+                await self._bus.publish(payload["event"], payload.get("data"))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error("Redis 事件中继中断: %s", e)
+        finally:
+            await pubsub.aclose()
+
+
 # 全局事件总线单例
 event_bus = EventBus()
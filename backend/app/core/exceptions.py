@@ -1,9 +1,7 @@
 """全局异常定义和处理器。"""
 
 from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse
-
-from app.core.response import error
+from app.core.response import FastJSONResponse, error
 
 
 class AppException(Exception):
@@ -40,7 +38,7 @@ def register_exception_handlers(app: FastAPI) -> None:
 
     @app.exception_handler(AppException)
     async def app_exception_handler(_: Request, exc: AppException):
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=exc.code,
             content=error(code=exc.code, message=exc.message),
         )
@@ -49,7 +47,7 @@ def register_exception_handlers(app: FastAPI) -> None:
     async def global_exception_handler(_: Request, exc: Exception):
         import logging
         logging.getLogger(__name__).error(f"Global Ex: {exc}", exc_info=True)
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=500,
             content=error(code=500, message="服务器内部错误"),
         )
@@ -0,0 +1,134 @@
+"""密码哈希执行器 — 将 bcrypt 计算移出事件循环。
+
+bcrypt 单次哈希/校验约耗时数百毫秒，直接在 async 处理器中调用会阻塞整个 worker。
+``PasswordHasher`` 把计算投递到专用线程池（或进程池），并用有界队列限制积压，
+队列满时直接拒绝（503），避免登录高峰拖垮其它请求。批量导入（:meth:`PasswordHasher.hash_many`）
+自行限制在途任务数，不经过队列上限检查，登录高峰时排队等待而不是中途失败。
+"""
+
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+import bcrypt
+
+from app.core.config import get_settings
+from app.core.exceptions import AppException
+from app.core.metrics import LatencyStats
+
+settings = get_settings()
+
+
+def hash_password(password: str) -> str:
+    """对明文密码进行 bcrypt 哈希（同步，会阻塞当前线程）。"""
+    salt = bcrypt.gensalt()
+    pwd_bytes = password.encode('utf-8')
+    return bcrypt.hashpw(pwd_bytes, salt).decode('utf-8')
+
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """验证明文密码与哈希是否匹配（同步，会阻塞当前线程）。"""
+    plain_bytes = plain_password.encode('utf-8')
+    hashed_bytes = hashed_password.encode('utf-8')
+    return bcrypt.checkpw(plain_bytes, hashed_bytes)
+
+
+class PasswordHasher:
+    """异步密码哈希器。
+
+    使用示例::
+
+        hashed = await password_hasher.hash("secret")
+        ok = await password_hasher.verify("secret", hashed)
+    """
+
+    def __init__(self, kind: str = "thread", workers: int = 4, max_queue: int = 64):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"不支持的密码哈希执行器类型: {kind}")
+        self.kind = kind
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor: Optional[Executor] = None
+        self._pending = 0
+        self._rejected = 0
+        self._latency = {"hash": LatencyStats(), "verify": LatencyStats()}
+
+    def _get_executor(self) -> Executor:
+        """按需创建执行器（进程池使用 spawn，避免 fork 事件循环线程）。"""
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="pwd-hash"
+                )
+        return self._executor
+
+    async def _run(self, op: str, fn: Callable[..., Any], *args: Any, admit: bool = True) -> Any:
+        """投递任务到执行器；``admit`` 为 True 时积压超过上限则拒绝。"""
+        if admit and self._pending >= self.workers + self.max_queue:
+            self._rejected += 1
+            raise AppException(code=503, message="系统繁忙，请稍后重试")
+
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        self._pending += 1
+        try:
+            return await loop.run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            self._pending -= 1
+            self._latency[op].record(time.perf_counter() - started)
+
+    async def hash(self, password: str) -> str:
+        """异步计算密码哈希。"""
+        return await self._run("hash", hash_password, password)
+
+    async def hash_many(self, passwords: list[str]) -> list[str]:
+        """批量计算哈希（批量导入用）。
+
+        同时在途的任务数不超过工作线程数，不占满积压队列，避免挤掉登录请求；
+        自身不受队列上限拒绝，登录高峰时只是变慢，不会让导入中途失败。
+        """
+        semaphore = asyncio.Semaphore(self.workers)
+
+        async def _one(password: str) -> str:
+            async with semaphore:
+                return await self._run("hash", hash_password, password, admit=False)
+
+        return list(await asyncio.gather(*(_one(p) for p in passwords)))
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """异步校验密码。"""
+        return await self._run("verify", verify_password, plain_password, hashed_password)
+
+    def snapshot(self) -> dict:
+        """导出队列深度与耗时指标。"""
+        return {
+            "executor": self.kind,
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "in_flight": self._pending,
+            "queue_depth": max(0, self._pending - self.workers),
+            "rejected": self._rejected,
+            "hash": self._latency["hash"].snapshot(),
+            "verify": self._latency["verify"].snapshot(),
+        }
+
+    def shutdown(self) -> None:
+        """关闭执行器（应用关闭时调用）。"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# 全局密码哈希器单例
+password_hasher = PasswordHasher(
+    kind=settings.password_hash_executor,
+    workers=settings.password_hash_workers,
+    max_queue=settings.password_hash_max_queue,
+)
@@ -0,0 +1,29 @@
+"""进程内运行指标的通用构件。"""
+
+from collections import deque
+
+
+class LatencyStats:
+    """最近 N 次耗时的滑动窗口统计。"""
+
+    def __init__(self, window: int = 1024):
+        self._samples: deque[float] = deque(maxlen=window)
+        self.count = 0
+
+    def record(self, seconds: float) -> None:
+        """记录一次耗时。"""
+        self._samples.append(seconds)
+        self.count += 1
+
+    def snapshot(self) -> dict:
+        """导出毫秒级统计。"""
+        if not self._samples:
+            return {"count": self.count, "avg_ms": 0.0, "p95_ms": 0.0, "max_ms": 0.0}
+        ordered = sorted(self._samples)
+        p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+        return {
+            "count": self.count,
+            "avg_ms": round(sum(ordered) / len(ordered) * 1000, 2),
+            "p95_ms": round(p95 * 1000, 2),
+            "max_ms": round(ordered[-1] * 1000, 2),
+        }
@@ -0,0 +1,270 @@
+"""分页工具 — 页码分页与游标（keyset）分页。
+
+页码模式沿用 ``OFFSET (page-1)*page_size``；游标模式按排序列做范围查询，
+深翻页性能与第一页相同。游标是对最后一行排序键的不透明编码。
+
+使用示例::
+
+    result = await paginate(
+        db, select(User),
+        order=[(User.created_at, True), (User.id, True)],
+        page=page, page_size=page_size, cursor=cursor, with_total=with_total,
+    )
+    return page_response(result.items, result.total, page, page_size, result.next_cursor)
+
+客户端传 ``cursor=``（空字符串）开始游标模式，之后传回响应中的 ``next_cursor``；
+``next_cursor`` 为 null 表示没有更多数据。
+
+总数统计策略（``count_mode``，客户端通过 ``count`` 查询参数逐请求选择）：
+
+- ``exact``：每次执行 ``COUNT(*)``（默认）
+- ``cached``：精确值按 (SQL, 参数) 缓存数秒，涉及的表有写入提交后立即失效
+- ``estimated``：无过滤条件的大表直接读取 PostgreSQL 规划器统计
+  （``pg_class.reltuples``）；查询可以带多对一的 LEFT OUTER JOIN（如用户列表连接部门），
+  这类连接不改变行数，按驱动表估算；不满足条件时退回 ``cached``
+"""
+
+import base64
+import json
+import logging
+from datetime import date, datetime
+from typing import Any, NamedTuple, Optional, Sequence
+
+from sqlalchemy import Join, Select, Table, True_, func, literal, select, text, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import operators
+from sqlalchemy.sql.elements import BinaryExpression
+from sqlalchemy.sql.util import find_tables
+
+from app.core.cache import TTLCache
+from app.core.config import get_settings
+from app.core.event_bus import event_bus
+from app.core.exceptions import AppException
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+COUNT_EXACT = "exact"
+COUNT_CACHED = "cached"
+COUNT_ESTIMATED = "estimated"
+COUNT_MODES = (COUNT_EXACT, COUNT_CACHED, COUNT_ESTIMATED)
+# 供路由 Query(pattern=...) 校验使用
+COUNT_MODE_PATTERN = "^(" + "|".join(COUNT_MODES) + ")$"
+
+
+class PageResult(NamedTuple):
+    """分页查询结果。"""
+
+    items: list
+    total: Optional[int]
+    next_cursor: Optional[str]
+
+
+def _encode_value(value: Any) -> Any:
+    """将排序键值转为可 JSON 序列化的形式。"""
+    if isinstance(value, datetime):
+        return {"$dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"$d": value.isoformat()}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    """还原 _encode_value 编码的排序键值。"""
+    if isinstance(value, dict):
+        if "$dt" in value:
+            return datetime.fromisoformat(value["$dt"])
+        if "$d" in value:
+            return date.fromisoformat(value["$d"])
+    return value
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """把排序键编码为不透明游标。"""
+    raw = json.dumps([_encode_value(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> list[Any]:
+    """解码游标，格式不符时抛出 400。"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if not isinstance(values, list) or len(values) != size:
+            raise ValueError
+        return [_decode_value(v) for v in values]
+    except (ValueError, TypeError):
+        raise AppException(code=400, message="无效的分页游标")
+
+
+class CountStrategy:
+    """分页总数统计策略。
+
+    缓存键包含查询涉及的每张表的写入代数，任一表有写入提交（``db.tables_changed``
+    事件）即代数递增，旧缓存自然失效。
+    """
+
+    def __init__(self, ttl: int = 30, estimate_threshold: int = 100000):
+        self.estimate_threshold = estimate_threshold
+        self._cache = TTLCache(maxsize=4096, ttl=ttl)
+        self._generations: dict[str, int] = {}
+
+    def invalidate(self, tables: Sequence[str]) -> None:
+        """使涉及给定表的缓存总数失效。"""
+        for name in tables:
+            self._generations[name] = self._generations.get(name, 0) + 1
+
+    async def count(self, db: AsyncSession, query: Select, mode: str = COUNT_EXACT) -> int:
+        """按策略统计查询的总行数。"""
+        if mode not in COUNT_MODES:
+            raise AppException(code=400, message=f"不支持的总数统计方式: {mode}")
+        if mode == COUNT_ESTIMATED:
+            estimate = await self._estimate(db, query)
+            if estimate is not None:
+                return estimate
+            mode = COUNT_CACHED
+
+        count_query = select(func.count()).select_from(query.order_by(None).subquery())
+        if mode == COUNT_EXACT:
+            return (await db.execute(count_query)).scalar() or 0
+
+        key = self._cache_key(db, count_query)
+        total = self._cache.get(key)
+        if total is None:
+            total = (await db.execute(count_query)).scalar() or 0
+            self._cache.set(key, total)
+        return total
+
+    def _cache_key(self, db: AsyncSession, count_query: Select) -> tuple:
+        """由编译后的 SQL、参数与涉及表的写入代数组成缓存键。"""
+        compiled = count_query.compile(dialect=db.get_bind().dialect)
+        tables = sorted({t.name for t in find_tables(count_query, include_crud=False)
+                         if isinstance(t, Table)})
+        generations = tuple(self._generations.get(name, 0) for name in tables)
+        params = repr(sorted(compiled.params.items()))
+        return (str(compiled), params, tuple(tables), generations)
+
+    async def _estimate(self, db: AsyncSession, query: Select) -> Optional[int]:
+        """读取规划器估算行数；非 PostgreSQL、带过滤条件或小表时返回 None。"""
+        if db.get_bind().dialect.name != "postgresql":
+            return None
+        where = query.whereclause
+        if where is not None and not isinstance(where, True_):
+            return None
+        if query._group_by_clauses or query._having_criteria or query._distinct:
+            return None
+        froms = query.get_final_froms()
+        table = _row_source(froms[0]) if len(froms) == 1 else None
+        if table is None:
+            return None
+
+        estimate = await db.scalar(
+            text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:name)"),
+            {"name": table.fullname},
+        )
+        # 从未 ANALYZE 的表 reltuples 为 -1；小表精确统计代价很低
+        if estimate is None or estimate < self.estimate_threshold:
+            return None
+        return int(estimate)
+
+
+def _row_source(from_clause: Any) -> Optional[Table]:
+    """找出决定行数的驱动表。
+
+    只剥离多对一的 LEFT OUTER JOIN（``ON 左表列 = 右表主键``）：左表每行恰好对应一行
+    结果，行数与驱动表相同。其它连接返回 None。
+    """
+    while isinstance(from_clause, Join):
+        if not from_clause.isouter or from_clause.full:
+            return None
+        if not _matches_primary_key(from_clause.onclause, from_clause.right):
+            return None
+        from_clause = from_clause.left
+    return from_clause if isinstance(from_clause, Table) else None
+
+
+def _matches_primary_key(onclause: Any, right: Any) -> bool:
+    """ON 条件是否为单列等值连接到右表的单列主键（右表至多匹配一行）。"""
+    primary_key = list(getattr(right, "primary_key", ()))
+    if len(primary_key) != 1 or not isinstance(onclause, BinaryExpression):
+        return False
+    if onclause.operator is not operators.eq:
+        return False
+    pk = primary_key[0]
+    return onclause.left.compare(pk) or onclause.right.compare(pk)
+
+
+# 全局总数统计策略单例
+count_strategy = CountStrategy(
+    ttl=settings.count_cache_ttl,
+    estimate_threshold=settings.count_estimate_threshold,
+)
+
+
+async def _on_tables_changed(_: str, data: dict) -> None:
+    """表写入提交后使相关缓存总数失效。"""
+    count_strategy.invalidate(data.get("tables", []))
+
+
+async def _on_department_changed(_: str, __: dict) -> None:
+    """部门变更会改写闭包表（Core 语句，不经过 ORM flush 追踪）。"""
+    count_strategy.invalidate(["department_closure"])
+
+
+event_bus.subscribe("db.tables_changed", _on_tables_changed)
+for _event in ("department.created", "department.updated", "department.deleted"):
+    event_bus.subscribe(_event, _on_department_changed)
+
+
+async def paginate(
+    db: AsyncSession,
+    query: Select,
+    order: Sequence[tuple[Any, bool]],
+    page: int = 1,
+    page_size: int = 20,
+    cursor: Optional[str] = None,
+    with_total: bool = True,
+    scalars: bool = True,
+    count_mode: str = COUNT_EXACT,
+) -> PageResult:
+    """执行分页查询。
+
+    :param order: 排序列及是否降序，如 ``[(T.created_at, True), (T.id, True)]``；
+        最后一列必须唯一（通常为主键），所有列方向须一致
+    :param cursor: None 表示页码模式；字符串（可为空串）表示游标模式
+    :param with_total: 是否统计总数（游标模式下可关闭以省去 count 查询）
+    :param scalars: True 返回 ORM 实体，False 返回 Row
+    :param count_mode: 总数统计方式，见 :class:`CountStrategy`
+    """
+    columns = [column for column, _ in order]
+    descending = order[0][1]
+    if any(desc != descending for _, desc in order):
+        raise ValueError("游标分页要求所有排序列方向一致")
+
+    total = None
+    if with_total:
+        total = await count_strategy.count(db, query, count_mode)
+
+    query = query.order_by(*(c.desc() if descending else c.asc() for c in columns))
+
+    if cursor is None:
+        query = query.offset((page - 1) * page_size).limit(page_size)
+        result = await db.execute(query)
+        items = list(result.scalars().all() if scalars else result.all())
+        return PageResult(items, total, None)
+
+    if cursor:
+        values = decode_cursor(cursor, len(columns))
+        key = tuple_(*columns)
+        bound = tuple_(*(literal(v, type_=c.type) for c, v in zip(columns, values)))
+        query = query.where(key < bound if descending else key > bound)
+
+    # 多取一行判断是否还有下一页
+    result = await db.execute(query.limit(page_size + 1))
+    items = list(result.scalars().all() if scalars else result.all())
+    next_cursor = None
+    if len(items) > page_size:
+        items = items[:page_size]
+        last = items[-1]
+        next_cursor = encode_cursor([getattr(last, c.key) for c in columns])
+    return PageResult(items, total, next_cursor)
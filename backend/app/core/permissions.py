@@ -0,0 +1,211 @@
+"""权限位图注册表与 ``require_permission`` 依赖。
+
+每个权限码（``Permission.code`` 及插件 manifest 中声明的 ``permissions``）分配一个
+固定的位序号，每个角色预编译为位掩码。请求期间的鉴权只需对用户全部角色的掩码
+做按位或 / 按位与，不访问数据库。
+
+未启用 Redis 事件中继时，其它 worker 上的角色变更由 :mod:`app.core.state_poller`
+定期全量重新加载发现，掩码有变化时递增授权代数。
+
+使用示例::
+
+    @router.post("", dependencies=[Depends(require_permission("user:create"))])
+    async def create_user(...): ...
+"""
+
+import logging
+from typing import Iterable
+
+from fastapi import Depends
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import async_session_factory
+from app.core.event_bus import event_bus
+from app.core.exceptions import ForbiddenException
+from app.core.security import get_current_user
+from app.core.state_poller import state_poller
+from app.schemas.auth import Principal
+
+logger = logging.getLogger(__name__)
+
+# 超级管理员角色编码，编译为全量掩码
+SUPERUSER_ROLE_CODE = "admin"
+ALL_PERMISSIONS = -1
+
+
+class PermissionRegistry:
+    """权限码 → 位序号、角色 → 位掩码 的进程内注册表。"""
+
+    def __init__(self):
+        self._bits: dict[str, int] = {}
+        self._codes: list[str] = []
+        self._role_masks: dict[int, int] = {}
+        self._combo_masks: dict[tuple[int, ...], int] = {}
+
+    def register_codes(self, codes: Iterable[str]) -> None:
+        """为新权限码分配位序号；已分配的保持不变。"""
+        for code in codes:
+            if code not in self._bits:
+                self._bits[code] = len(self._codes)
+                self._codes.append(code)
+
+    def mask_of(self, codes: Iterable[str]) -> int:
+        """计算一组权限码的掩码（未注册的码会先注册）。"""
+        codes = list(codes)
+        self.register_codes(codes)
+        mask = 0
+        for code in codes:
+            mask |= 1 << self._bits[code]
+        return mask
+
+    def codes_of(self, mask: int) -> list[str]:
+        """将掩码还原为权限码列表。"""
+        if mask == ALL_PERMISSIONS:
+            return list(self._codes)
+        return [code for i, code in enumerate(self._codes) if mask >> i & 1]
+
+    def set_role(self, role_id: int, role_code: str, permission_codes: Iterable[str]) -> None:
+        """编译并登记单个角色的掩码。"""
+        if role_code == SUPERUSER_ROLE_CODE:
+            mask = ALL_PERMISSIONS
+        else:
+            mask = self.mask_of(permission_codes)
+        self._role_masks[role_id] = mask
+        self._combo_masks.clear()
+
+    def drop_role(self, role_id: int) -> None:
+        """移除角色掩码。"""
+        self._role_masks.pop(role_id, None)
+        self._combo_masks.clear()
+
+    def user_mask(self, role_ids: Iterable[int]) -> int:
+        """计算用户所有角色掩码的按位或（按角色组合缓存）。"""
+        key = tuple(sorted(role_ids))
+        mask = self._combo_masks.get(key)
+        if mask is None:
+            mask = 0
+            for role_id in key:
+                mask |= self._role_masks.get(role_id, 0)
+            self._combo_masks[key] = mask
+        return mask
+
+    async def load(self, db: AsyncSession) -> bool:
+        """从数据库全量加载权限码与角色掩码，返回角色掩码是否有变化。"""
+        from app.models.user import Permission, Role, role_permissions
+
+        codes = (await db.execute(select(Permission.code).order_by(Permission.id))).scalars().all()
+        self.register_codes(codes)
+
+        rows = await db.execute(
+            select(Role.id, Role.code, Permission.code)
+            .select_from(Role)
+            .outerjoin(role_permissions, role_permissions.c.role_id == Role.id)
+            .outerjoin(Permission, Permission.id == role_permissions.c.permission_id)
+        )
+        grouped: dict[int, tuple[str, list[str]]] = {}
+        for role_id, role_code, perm_code in rows.all():
+            entry = grouped.setdefault(role_id, (role_code, []))
+            if perm_code:
+                entry[1].append(perm_code)
+
+        before = self._role_masks
+        self._role_masks = {}
+        for role_id, (role_code, perm_codes) in grouped.items():
+            self.set_role(role_id, role_code, perm_codes)
+        changed = self._role_masks != before
+        if changed:
+            logger.info("权限注册表已加载: %d 个权限码, %d 个角色", len(self._codes), len(grouped))
+        return changed
+
+    async def rebuild_role(self, db: AsyncSession, role_id: int) -> None:
+        """从数据库重新编译单个角色。"""
+        from app.models.user import Permission, Role, role_permissions
+
+        role_code = await db.scalar(select(Role.code).where(Role.id == role_id))
+        if role_code is None:
+            self.drop_role(role_id)
+            return
+        perm_codes = (
+            await db.execute(
+                select(Permission.code)
+                .join(role_permissions, role_permissions.c.permission_id == Permission.id)
+                .where(role_permissions.c.role_id == role_id)
+            )
+        ).scalars().all()
+        self.set_role(role_id, role_code, perm_codes)
+
+
+class AuthGeneration:
+    """授权数据代数。
+
+    角色、权限、菜单或用户-角色关系发生变化时递增，派生缓存（如 ``/auth/me``
+    载荷）以 (用户, 代数) 为键，代数变化即整体失效。
+    """
+
+    def __init__(self):
+        self.value = 0
+
+    def bump(self) -> None:
+        """递增代数。"""
+        self.value += 1
+
+
+# 全局权限注册表与授权代数单例
+permission_registry = PermissionRegistry()
+auth_generation = AuthGeneration()
+
+
+async def _on_role_changed(_: str, data: dict) -> None:
+    """角色创建/更新后重新编译其掩码。"""
+    auth_generation.bump()
+    async with async_session_factory() as db:
+        await permission_registry.rebuild_role(db, int(data["id"]))
+
+
+async def _on_role_deleted(_: str, data: dict) -> None:
+    """角色删除后移除其掩码。"""
+    auth_generation.bump()
+    permission_registry.drop_role(int(data["id"]))
+
+
+async def _on_authz_changed(_: str, data: dict) -> None:
+    """菜单或用户角色关系变化时递增授权代数。"""
+    if data is None or data.get("roles_changed", True):
+        auth_generation.bump()
+
+
+async def _on_plugin_reloaded(_: str, data: dict) -> None:
+    """插件热重载后为 manifest 中新增的权限码分配位序号。"""
+    permission_registry.register_codes(data.get("permissions", []))
+
+
+async def _refresh_permissions(db: AsyncSession) -> None:
+    """轮询兜底：重新加载全部角色掩码，有变化时递增授权代数。"""
+    if await permission_registry.load(db):
+        auth_generation.bump()
+
+
+event_bus.subscribe("role.created", _on_role_changed)
+event_bus.subscribe("role.updated", _on_role_changed)
+event_bus.subscribe("role.deleted", _on_role_deleted)
+event_bus.subscribe("plugin.reloaded", _on_plugin_reloaded)
+for _event in ("menu.created", "menu.updated", "menu.deleted", "user.updated"):
+    event_bus.subscribe(_event, _on_authz_changed)
+state_poller.register("permissions", _refresh_permissions)
+
+
+def require_permission(*codes: str):
+    """FastAPI 依赖工厂：要求当前用户同时拥有全部给定权限码。
+
+    掩码在定义时预先计算，请求期间只做一次按位与。
+    """
+    required = permission_registry.mask_of(codes)
+
+    async def dependency(current_user: Principal = Depends(get_current_user)) -> Principal:
+        mask = permission_registry.user_mask(current_user.role_ids)
+        if mask & required != required:
+            raise ForbiddenException()
+        return current_user
+
+    return dependency
@@ -0,0 +1,121 @@
+"""插件路由分发 — 按插件名 O(1) 查找子应用。
+
+所有插件共用一个挂载在 ``/api/v1/plugins`` 的 :class:`PluginDispatcher`，按路径中的
+插件名段在字典中查到对应的 :class:`PluginApp`，再由插件自己的 ``APIRouter`` 匹配
+剩余路径。主应用的路由表只多出这一个 Mount，匹配耗时不随插件数量增长。
+
+插件路由不再平铺进 ``app.routes``，OpenAPI 文档由 :func:`install_openapi` 合并生成。
+声明了 ``limits`` 的插件，请求在其 :class:`~app.core.bulkhead.Bulkhead` 内执行。
+
+热重载时 :class:`PluginEngine` 在 ``apps`` 中原子替换插件的 :class:`PluginApp`：新请求
+立即进入新版本，已进入旧 ``PluginApp`` 的请求继续由旧路由处理完毕（``inflight`` 归零）。
+"""
+
+from typing import Callable, Iterable, Optional
+
+from fastapi import APIRouter, FastAPI
+from fastapi.openapi.utils import get_openapi
+from starlette.routing import BaseRoute
+from starlette.types import Receive, Scope, Send
+
+from app.core.bulkhead import Bulkhead
+from app.core.response import FastJSONResponse, error
+
+RouterLoader = Callable[[], Optional[APIRouter]]
+
+
+class PluginApp:
+    """单个插件的子应用；``router`` 为 None 时在首个请求到达时通过 ``loader`` 导入。"""
+
+    def __init__(
+        self,
+        name: str,
+        display_name: str,
+        loader: RouterLoader,
+        router: Optional[APIRouter] = None,
+        bulkhead: Optional[Bulkhead] = None,
+    ):
+        self.name = name
+        self.display_name = display_name
+        self.loader = loader
+        self.router = router
+        self.bulkhead = bulkhead
+        self.inflight = 0
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.inflight += 1
+        try:
+            if self.bulkhead is not None:
+                await self.bulkhead(self._dispatch, scope, receive, send)
+            else:
+                await self._dispatch(scope, receive, send)
+        finally:
+            self.inflight -= 1
+
+    async def _dispatch(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if self.router is None:
+            self.router = self.loader()
+            if self.router is None:
+                response = FastJSONResponse(error(503, "插件加载失败"), status_code=503)
+                await response(scope, receive, send)
+                return
+        await self.router(scope, receive, send)
+
+
+class PluginDispatcher:
+    """按插件名分发请求的 ASGI 应用。"""
+
+    def __init__(self):
+        self.apps: dict[str, PluginApp] = {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        root_path = scope.get("root_path", "")
+        path: str = scope["path"]
+        rest = path[len(root_path):] if path.startswith(root_path) else path
+        name = rest.lstrip("/").partition("/")[0]
+
+        app = self.apps.get(name)
+        if app is None:
+            response = FastJSONResponse(error(404, "资源不存在"), status_code=404)
+            await response(scope, receive, send)
+            return
+        # 与 Starlette Mount 一致：就地更新 scope，外层中间件可读到最终匹配的路由
+        scope["root_path"] = f"{root_path}/{name}"
+        await app(scope, receive, send)
+
+    def bulkhead_snapshot(self) -> dict[str, dict]:
+        """各插件的舱壁指标（未声明 ``limits`` 的插件不在其中）。"""
+        return {name: app.bulkhead.snapshot() for name, app in self.apps.items() if app.bulkhead is not None}
+
+    def openapi_routes(self, prefix: str) -> list[BaseRoute]:
+        """已导入路由的插件在完整路径下的路由副本（仅用于生成文档）。"""
+        docs = APIRouter()
+        for name, app in self.apps.items():
+            if app.router is not None:
+                docs.include_router(app.router, prefix=f"{prefix}/{name}", tags=[app.display_name])
+        return docs.routes
+
+
+def install_openapi(app: FastAPI, extra_routes: Callable[[], Iterable[BaseRoute]]) -> None:
+    """让 ``app.openapi()`` 同时包含插件路由（结果缓存在 ``app.openapi_schema``）。"""
+
+    def openapi() -> dict:
+        if app.openapi_schema is None:
+            app.openapi_schema = get_openapi(
+                title=app.title,
+                version=app.version,
+                openapi_version=app.openapi_version,
+                summary=app.summary,
+                description=app.description,
+                terms_of_service=app.terms_of_service,
+                contact=app.contact,
+                license_info=app.license_info,
+                routes=[*app.routes, *extra_routes()],
+                webhooks=app.webhooks.routes,
+                tags=app.openapi_tags,
+                servers=app.servers,
+                separate_input_output_schemas=app.separate_input_output_schemas,
+            )
+        return app.openapi_schema
+
+    app.openapi = openapi
@@ -9,25 +9,55 @@
 
 插件引擎会在应用启动时扫描 ``plugins/`` 目录，读取 manifest，
 动态导入 ``router.py`` 并将其路由挂载到 ``/api/v1/plugins/{name}/``。
+
+启动加速：
+
+- manifest 索引：各插件 manifest / router / models 文件的 mtime 与大小组成指纹，
+  未变化时直接读取 ``plugins/__pycache__/manifest_index.json``，不再逐个解析 manifest
+- 按 ``dependencies`` 拓扑排序加载；依赖缺失或循环依赖的插件不加载
+- 模型始终在启动时导入（建表与权限元数据需要）；``PLUGIN_LAZY_ROUTERS=true`` 时
+  首个请求到达时才导入 ``router.py``
+- 插件路由不平铺进主应用，而是由 :class:`~app.core.plugin_dispatch.PluginDispatcher`
+  按插件名分发，匹配耗时不随插件数量增长
+- 每个插件的导入耗时记录在 :attr:`PluginEngine.timings`
+
+运行期可通过 :meth:`PluginEngine.reload` 热重载单个插件的路由代码，无需重启进程。
+
+manifest 中的 ``limits`` 声明插件的并发、超时与数据库连接上限，见 :mod:`app.core.bulkhead`。
 """
 
+import asyncio
+import hashlib
 import importlib
 import json
 import logging
+import os
+import sys
+import time
 from pathlib import Path
-from typing import Any
+from typing import Any, Optional
+
+from fastapi import APIRouter, FastAPI
 
-from fastapi import FastAPI
+from app.core.bulkhead import Bulkhead, BulkheadLimits
+from app.core.event_bus import event_bus
+from app.core.plugin_dispatch import PluginApp, PluginDispatcher, install_openapi
 
 logger = logging.getLogger(__name__)
 
 PLUGINS_DIR = Path(__file__).resolve().parent.parent / "plugins"
+PLUGIN_ROUTE_PREFIX = "/api/v1/plugins"
+INDEX_PATH = PLUGINS_DIR / "__pycache__" / "manifest_index.json"
+INDEX_VERSION = 1
+
+# 参与索引指纹的文件
+_FINGERPRINT_FILES = ("manifest.json", "router.py", "models.py")
 
 
 class PluginManifest:
     """插件清单数据。"""
 
-    def __init__(self, data: dict[str, Any], plugin_dir: Path):
+    def __init__(self, data: dict[str, Any], plugin_dir: Path, has_models: bool = False):
         self.name: str = data["name"]
         self.version: str = data.get("version", "1.0.0")
         self.display_name: str = data.get("displayName", self.name)
@@ -37,7 +67,14 @@ class PluginManifest:
         self.dependencies: list[str] = data.get("dependencies", [])
         self.menus: list[dict] = data.get("menus", [])
         self.permissions: list[str] = data.get("permissions", [])
+        self.limits: dict[str, Any] = data.get("limits", {})
         self.plugin_dir = plugin_dir
+        self.has_models = has_models
+
+    @property
+    def prefix(self) -> str:
+        """路由挂载前缀。"""
+        return f"{PLUGIN_ROUTE_PREFIX}/{self.name}"
 
     def to_dict(self) -> dict:
         """序列化为字典。"""
@@ -53,6 +90,26 @@ class PluginManifest:
         }
 
 
+def _fingerprint(plugin_dirs: list[Path]) -> str:
+    """插件目录指纹：各关键文件的 mtime 与大小。"""
+    digest = hashlib.sha1()
+    for plugin_dir in plugin_dirs:
+        for filename in _FINGERPRINT_FILES:
+            try:
+                stat = (plugin_dir / filename).stat()
+                digest.update(f"{plugin_dir.name}/{filename}:{stat.st_mtime_ns}:{stat.st_size};".encode())
+            except FileNotFoundError:
+                digest.update(f"{plugin_dir.name}/{filename}:-;".encode())
+    return digest.hexdigest()
+
+
+def _pop_plugin_modules(name: str) -> dict[str, Any]:
+    """从 ``sys.modules`` 移除插件除模型外的全部子模块，返回被移除的模块。"""
+    package = f"app.plugins.{name}."
+    keys = [key for key in sys.modules if key.startswith(package) and key != f"{package}models"]
+    return {key: sys.modules.pop(key) for key in keys}
+
+
 class PluginEngine:
     """微内核插件引擎。
 
@@ -68,6 +125,9 @@ class PluginEngine:
     def __init__(self):
         self._manifests: dict[str, PluginManifest] = {}
         self._loaded: set[str] = set()
+        self._timings: dict[str, dict[str, float]] = {}
+        self.dispatcher = PluginDispatcher()
+        self._app: Optional[FastAPI] = None
 
     @property
     def manifests(self) -> dict[str, PluginManifest]:
@@ -79,11 +139,16 @@ class PluginEngine:
         """获取所有已加载的插件名。"""
         return self._loaded
 
+    @property
+    def timings(self) -> dict[str, dict[str, float]]:
+        """各插件的导入耗时（毫秒）：``{"workflow": {"models_ms": ..., "router_ms": ...}}``。"""
+        return self._timings
+
     def discover(self) -> list[PluginManifest]:
         """扫描 plugins 目录，发现所有有效插件。
 
         有效插件需同时包含 manifest.json 和 router.py。
-        跳过以 _ 开头的目录（如 _template）。
+        跳过以 _ 开头的目录（如 _template）。目录指纹未变化时使用缓存的索引。
         """
         self._manifests.clear()
 
@@ -91,12 +156,26 @@ class PluginEngine:
             logger.warning("插件目录不存在: %s", PLUGINS_DIR)
             return []
 
-        for plugin_dir in sorted(PLUGINS_DIR.iterdir()):
-            if not plugin_dir.is_dir():
-                continue
-            if plugin_dir.name.startswith("_"):
-                continue
+        plugin_dirs = [
+            d for d in sorted(PLUGINS_DIR.iterdir()) if d.is_dir() and not d.name.startswith("_")
+        ]
+        fingerprint = _fingerprint(plugin_dirs)
+        entries = self._read_index(fingerprint)
+        if entries is None:
+            entries = self._scan(plugin_dirs)
+            self._write_index(fingerprint, entries)
+
+        for entry in entries:
+            manifest = PluginManifest(entry["manifest"], PLUGINS_DIR / entry["dir"], entry["has_models"])
+            self._manifests[manifest.name] = manifest
+            logger.info("发现插件: %s v%s", manifest.display_name, manifest.version)
 
+        return list(self._manifests.values())
+
+    def _scan(self, plugin_dirs: list[Path]) -> list[dict]:
+        """逐个读取并校验 manifest。"""
+        entries = []
+        for plugin_dir in plugin_dirs:
             manifest_path = plugin_dir / "manifest.json"
             router_path = plugin_dir / "router.py"
 
@@ -110,52 +189,197 @@ class PluginEngine:
             try:
                 with open(manifest_path, "r", encoding="utf-8") as f:
                     data = json.load(f)
-                manifest = PluginManifest(data, plugin_dir)
-                self._manifests[manifest.name] = manifest
-                logger.info("发现插件: %s v%s", manifest.display_name, manifest.version)
+                PluginManifest(data, plugin_dir)  # 校验必填字段
             except Exception as e:
                 logger.error("解析插件 %s 的 manifest 失败: %s", plugin_dir.name, e)
+                continue
+            entries.append({
+                "dir": plugin_dir.name,
+                "manifest": data,
+                "has_models": (plugin_dir / "models.py").exists(),
+            })
+        return entries
+
+    def _read_index(self, fingerprint: str) -> Optional[list[dict]]:
+        """读取指纹匹配的 manifest 索引。"""
+        try:
+            with open(INDEX_PATH, "r", encoding="utf-8") as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if index.get("version") != INDEX_VERSION or index.get("fingerprint") != fingerprint:
+            return None
+        return index["plugins"]
+
+    def _write_index(self, fingerprint: str, entries: list[dict]) -> None:
+        """写入 manifest 索引（原子替换；目录只读时忽略）。"""
+        index = {"version": INDEX_VERSION, "fingerprint": fingerprint, "plugins": entries}
+        tmp_path = INDEX_PATH.with_name(f"{INDEX_PATH.name}.{os.getpid()}.tmp")
+        try:
+            INDEX_PATH.parent.mkdir(exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(index, f, ensure_ascii=False)
+            os.replace(tmp_path, INDEX_PATH)
+        except OSError as e:
+            logger.debug("写入插件索引失败: %s", e)
+
+    def load_order(self) -> list[PluginManifest]:
+        """按依赖拓扑排序的插件列表；依赖缺失或循环依赖的插件被剔除。"""
+        order: list[PluginManifest] = []
+        state: dict[str, str] = {}  # visiting / done / failed
+
+        def visit(name: str, chain: tuple[str, ...]) -> bool:
+            if state.get(name) == "done":
+                return True
+            if state.get(name) == "failed":
+                return False
+            if state.get(name) == "visiting":
+                logger.error("插件循环依赖: %s", " → ".join((*chain, name)))
+                return False
+            manifest = self._manifests.get(name)
+            if manifest is None:
+                logger.error("插件 %s 依赖的插件 %s 不存在", chain[-1], name)
+                return False
+            state[name] = "visiting"
+            ok = all(visit(dep, (*chain, name)) for dep in manifest.dependencies)
+            state[name] = "done" if ok else "failed"
+            if ok:
+                order.append(manifest)
+            else:
+                logger.error("插件 %s 的依赖无法满足，跳过加载", name)
+            return ok
+
+        for name in self._manifests:
+            visit(name, ())
+        return order
+
+    def import_models(self) -> None:
+        """按依赖顺序导入全部插件模型（使 SQLAlchemy / Alembic 能发现插件的表）。"""
+        for manifest in self.load_order():
+            self._import_models(manifest)
+
+    def _import_models(self, manifest: PluginManifest) -> bool:
+        """导入单个插件的模型。"""
+        if not manifest.has_models:
+            return True
+        models_path = f"app.plugins.{manifest.name}.models"
+        started = time.perf_counter()
+        try:
+            importlib.import_module(models_path)
+        except Exception as e:
+            logger.error("导入插件 %s 的模型失败: %s", manifest.name, e)
+            return False
+        self._record(manifest.name, "models_ms", started)
+        logger.info("已导入插件模型: %s", models_path)
+        return True
+
+    def import_router(self, manifest: PluginManifest) -> Optional[APIRouter]:
+        """导入插件路由模块，返回其中的 ``router``。"""
+        started = time.perf_counter()
+        try:
+            module = importlib.import_module(f"app.plugins.{manifest.name}.router")
+        except Exception as e:
+            logger.error("加载插件 %s 失败: %s", manifest.name, e)
+            return None
+        self._record(manifest.name, "router_ms", started)
+        router = getattr(module, "router", None)
+        if router is None:
+            logger.error("插件 %s 的 router.py 中未找到 'router' 对象", manifest.name)
+        return router
 
-        return list(self._manifests.values())
+    def _record(self, name: str, key: str, started: float) -> None:
+        self._timings.setdefault(name, {})[key] = round((time.perf_counter() - started) * 1000, 1)
 
-    def load_all(self, app: FastAPI) -> None:
-        """加载所有已发现的插件，将路由挂载到 FastAPI 应用。"""
-        for name, manifest in self._manifests.items():
-            self._load_plugin(app, manifest)
+    def load_all(self, app: FastAPI, lazy: bool = False) -> None:
+        """按依赖顺序加载所有已发现的插件，将路由挂载到 FastAPI 应用。
 
-    def _load_plugin(self, app: FastAPI, manifest: PluginManifest) -> None:
+        :param lazy: 为 True 时路由在首个请求到达时才导入
+        """
+        self._app = app
+        if not any(getattr(route, "app", None) is self.dispatcher for route in app.routes):
+            app.mount(PLUGIN_ROUTE_PREFIX, self.dispatcher, name="plugins")
+            install_openapi(app, lambda: self.dispatcher.openapi_routes(PLUGIN_ROUTE_PREFIX))
+        for manifest in self.load_order():
+            self._load_plugin(manifest, lazy)
+        if self._timings:
+            logger.info("插件导入耗时(ms): %s", json.dumps(self._timings, ensure_ascii=False))
+
+    def _load_plugin(self, manifest: PluginManifest, lazy: bool = False) -> None:
         """加载单个插件。"""
         if manifest.name in self._loaded:
             return
+        # 模型始终立即导入，使得 SQLAlchemy 能发现并在 create_all 时生成表
+        if not self._import_models(manifest):
+            return
 
-        try:
-            # 自动导入插件模型 (如果存在)，使得 SQLAlchemy 能发现并在 create_all 时生成表
-            try:
-                models_path = f"app.plugins.{manifest.name}.models"
-                importlib.import_module(models_path)
-                logger.info("已导入插件模型: %s", models_path)
-            except ImportError:
-                # 插件可能没有 models.py，这是正常的
-                pass
-
-            module_path = f"app.plugins.{manifest.name}.router"
-            module = importlib.import_module(module_path)
-            router = getattr(module, "router", None)
-
+        router = None
+        if not lazy:
+            router = self.import_router(manifest)
             if router is None:
-                logger.error(
-                    "插件 %s 的 router.py 中未找到 'router' 对象", manifest.name
-                )
                 return
-
-            prefix = f"/api/v1/plugins/{manifest.name}"
-            app.include_router(router, prefix=prefix, tags=[manifest.display_name])
-            self._loaded.add(manifest.name)
-            logger.info(
-                "已加载插件: %s → %s", manifest.display_name, prefix
-            )
-        except Exception as e:
-            logger.error("加载插件 %s 失败: %s", manifest.name, e)
+        self.dispatcher.apps[manifest.name] = self._plugin_app(manifest, router)
+        self._loaded.add(manifest.name)
+        logger.info(
+            "已加载插件: %s → %s%s", manifest.display_name, manifest.prefix, "（延迟导入路由）" if lazy else ""
+        )
+
+    def _plugin_app(
+        self, manifest: PluginManifest, router: Optional[APIRouter], previous: Optional[PluginApp] = None
+    ) -> PluginApp:
+        """构造插件子应用；舱壁上限未变化时沿用 ``previous`` 的舱壁（保留排队与指标）。"""
+        bulkhead = previous.bulkhead if previous is not None else None
+        limits = BulkheadLimits.from_manifest(manifest.limits) if manifest.limits else None
+        if limits is None:
+            bulkhead = None
+        elif bulkhead is None or bulkhead.limits.to_dict() != limits.to_dict():
+            bulkhead = Bulkhead(manifest.name, limits)
+        return PluginApp(
+            manifest.name, manifest.display_name, lambda: self.import_router(manifest), router, bulkhead
+        )
+
+    async def reload(self, name: str) -> Optional[dict]:
+        """热重载已加载的插件：重新读取 manifest、重新导入路由模块，再原子替换子应用。
+
+        ``models`` 不重新导入（表结构变化仍需迁移后重启），也不重新建表或初始化数据。
+        已进入旧版本的请求继续由旧路由处理完毕。导入失败时保留旧版本并返回 None。
+        """
+        previous = self.dispatcher.apps.get(name)
+        current = self._manifests.get(name)
+        if previous is None or current is None:
+            logger.error("插件 %s 未加载，无法重载", name)
+            return None
+
+        entries = self._scan([current.plugin_dir])
+        if not entries or entries[0]["manifest"]["name"] != name:
+            logger.error("插件 %s 的 manifest 无效，取消重载", name)
+            return None
+        manifest = PluginManifest(entries[0]["manifest"], current.plugin_dir, current.has_models)
+
+        # 清除路由及其依赖模块（模型除外）后在线程中重新导入；模块代码执行期间持有 GIL，
+        # 事件循环只能与之交替运行，重载窗口（数十到上百毫秒）内的请求延迟会升高
+        stale = _pop_plugin_modules(name)
+        importlib.invalidate_caches()
+        router = await asyncio.to_thread(self.import_router, manifest)
+        if router is None:
+            _pop_plugin_modules(name)  # 丢弃导入到一半的新模块
+            sys.modules.update(stale)
+            return None
+
+        self._manifests[name] = manifest
+        self.dispatcher.apps[name] = self._plugin_app(manifest, router, previous)
+        if self._app is not None:
+            self._app.openapi_schema = None
+        # manifest 中新增的权限码由权限注册表（订阅方）分配位序号
+        await event_bus.publish("plugin.reloaded", {"name": name, "permissions": manifest.permissions})
+        logger.info(
+            "已重载插件: %s v%s（旧版本进行中的请求: %d）", manifest.display_name, manifest.version, previous.inflight
+        )
+        return {
+            "name": name,
+            "version": manifest.version,
+            "router_ms": self._timings[name]["router_ms"],
+            "draining": previous.inflight,
+        }
 
     def get_manifest(self, name: str) -> PluginManifest | None:
         """根据名称获取插件清单。"""
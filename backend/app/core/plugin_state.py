@@ -0,0 +1,128 @@
+"""插件启停状态表与请求入口闸门。
+
+``plugin_records.enabled`` 是插件启停的唯一依据：
+
+- 启动时 :meth:`PluginStateTable.load` 全量读入内存
+- ``PluginService.toggle`` 提交后广播 ``plugin.toggled``，各 worker（启用 Redis 时经
+  :class:`~app.core.event_bus.RedisEventRelay` 转发）就地更新内存表
+- 未启用 Redis 时事件只到达处理请求的 worker，其它 worker 每 ``PLUGIN_STATE_POLL_SECONDS``
+  秒重新读取一次禁用列表（:meth:`PluginStateTable.start`），状态最多滞后一个轮询周期
+- :class:`PluginGateMiddleware` 在路由之前检查 ``/api/v1/plugins/{name}/...``，
+  已禁用插件直接返回 403，请求期间不访问数据库
+
+核心的插件管理接口（``PUT /api/v1/plugins/{name}/toggle``、``POST .../reload``）按方法与
+路径精确放行，否则禁用后将无法重新启用；插件自身的同名路由仍受闸门限制。
+"""
+
+import asyncio
+import logging
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.event_bus import event_bus
+from app.core.plugin_engine import PLUGIN_ROUTE_PREFIX
+from app.core.response import FastJSONResponse, error
+
+logger = logging.getLogger(__name__)
+
+# 插件路由前缀下由核心处理、不经过闸门的 (方法, 子路径)
+CORE_PLUGIN_ACTIONS = frozenset({("PUT", "toggle"), ("POST", "reload")})
+
+
+class PluginStateTable:
+    """进程内插件启停状态（未登记的插件视为启用）。"""
+
+    def __init__(self):
+        self._disabled: frozenset[str] = frozenset()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def disabled(self) -> frozenset[str]:
+        """已禁用的插件名。"""
+        return self._disabled
+
+    def is_enabled(self, name: str) -> bool:
+        """插件是否启用。"""
+        return name not in self._disabled
+
+    def set(self, name: str, enabled: bool) -> None:
+        """更新单个插件的状态。"""
+        if enabled:
+            self._disabled = self._disabled - {name}
+        else:
+            self._disabled = self._disabled | {name}
+
+    async def load(self, db: AsyncSession) -> None:
+        """从数据库全量加载插件状态。"""
+        from app.models.plugin import PluginRecord
+
+        rows = await db.execute(select(PluginRecord.name).where(PluginRecord.enabled.is_(False)))
+        disabled = frozenset(rows.scalars().all())
+        if disabled != self._disabled or self._task is None:
+            logger.info("插件状态已加载: %d 个插件已禁用", len(disabled))
+        self._disabled = disabled
+
+    async def _poll(self, session_factory: async_sessionmaker, interval: float) -> None:
+        """定期从数据库重新加载（未启用跨 worker 事件中继时的兜底）。"""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                async with session_factory() as db:
+                    await self.load(db)
+            except Exception as e:
+                logger.warning("刷新插件状态失败: %s", e)
+
+    def start(self, session_factory: async_sessionmaker, interval: float) -> None:
+        """启动后台轮询（``interval`` 不大于 0 时不启动）。"""
+        if interval > 0 and self._task is None:
+            self._task = asyncio.create_task(self._poll(session_factory, interval))
+
+    async def stop(self) -> None:
+        """停止后台轮询。"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# 全局插件状态表单例
+plugin_state = PluginStateTable()
+
+
+async def _on_plugin_toggled(_: str, data: dict) -> None:
+    """插件启停后更新内存状态。"""
+    plugin_state.set(data["name"], bool(data["enabled"]))
+    logger.info("插件 %s 已%s", data["name"], "启用" if data["enabled"] else "禁用")
+
+
+event_bus.subscribe("plugin.toggled", _on_plugin_toggled)
+
+
+class PluginGateMiddleware:
+    """拒绝访问已禁用插件的路由（路由匹配之前，纯内存判断）。"""
+
+    def __init__(self, app: ASGIApp, state: PluginStateTable = plugin_state):
+        self.app = app
+        self.state = state
+        self.prefix = PLUGIN_ROUTE_PREFIX + "/"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] in ("http", "websocket") and self.state.disabled:
+            path: str = scope["path"]
+            if path.startswith(self.prefix):
+                name, _, rest = path[len(self.prefix):].partition("/")
+                action = (scope.get("method"), rest)
+                if not self.state.is_enabled(name) and action not in CORE_PLUGIN_ACTIONS:
+                    if scope["type"] == "websocket":
+                        await send({"type": "websocket.close", "code": 1008})
+                        return
+                    response = FastJSONResponse(error(403, f"插件 {name} 已禁用"), status_code=403)
+                    await response(scope, receive, send)
+                    return
+        await self.app(scope, receive, send)
@@ -0,0 +1,105 @@
+"""列投影读模型的 SQL 构件。
+
+列表 / 详情接口只读取需要的列，关联集合（如用户的角色）用 JSON 聚合在同一条
+查询中取回，不构造 ORM 实体、不触发 identity map 与属性埋点。
+
+JSON 聚合按方言编译：
+
+- PostgreSQL：``json_agg(json_build_object(...))``
+- 其它（SQLite）：``json_group_array(json_object(...))``
+
+使用示例::
+
+    roles = json_array_subquery(
+        json_object_of(id=Role.id, name=Role.name),
+        select_from=user_roles.join(Role),
+        where=user_roles.c.user_id == User.id,
+    )
+    rows = (await db.execute(select(User.id, roles.label("roles")))).all()
+    items = rows_to_dicts(rows, json_lists=("roles",))
+"""
+
+from typing import Any, Iterable, Sequence
+
+from sqlalchemy import JSON, ColumnElement, FromClause, literal_column, select
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+
+
+class json_object(FunctionElement):
+    """由交替的键、值构造 JSON 对象。"""
+
+    type = JSON()
+    inherit_cache = True
+    name = "json_object"
+
+
+@compiles(json_object)
+def _json_object_default(element, compiler, **kw):
+    return f"json_object({compiler.process(element.clauses, **kw)})"
+
+
+@compiles(json_object, "postgresql")
+def _json_object_pg(element, compiler, **kw):
+    return f"json_build_object({compiler.process(element.clauses, **kw)})"
+
+
+class json_array_agg(FunctionElement):
+    """把分组内的值聚合为 JSON 数组。"""
+
+    type = JSON()
+    inherit_cache = True
+    name = "json_array_agg"
+
+
+@compiles(json_array_agg)
+def _json_array_agg_default(element, compiler, **kw):
+    return f"json_group_array({compiler.process(element.clauses, **kw)})"
+
+
+@compiles(json_array_agg, "postgresql")
+def _json_array_agg_pg(element, compiler, **kw):
+    return f"json_agg({compiler.process(element.clauses, **kw)})"
+
+
+def json_object_of(**columns: ColumnElement) -> json_object:
+    """``json_object_of(id=Role.id, name=Role.name)`` → ``{"id": ..., "name": ...}``。
+
+    键名为代码中的常量，以 SQL 字面量内联（PostgreSQL 无法推断键参数的类型）。
+    """
+    args: list[Any] = []
+    for key, column in columns.items():
+        args.extend((literal_column(f"'{key}'"), column))
+    return json_object(*args)
+
+
+def json_array_subquery(
+    value: ColumnElement,
+    select_from: FromClause,
+    where: ColumnElement,
+) -> ColumnElement:
+    """构造相关子查询：把关联行聚合为 JSON 数组，作为外层查询的一列。
+
+    子查询只对外层实际返回的行求值，与分页 LIMIT 配合良好。
+    """
+    return (
+        select(json_array_agg(value))
+        .select_from(select_from)
+        .where(where)
+        .scalar_subquery()
+    )
+
+
+def rows_to_dicts(rows: Iterable, json_lists: Sequence[str] = ()) -> list[dict]:
+    """将投影查询的 Row 转为字典；``json_lists`` 中的列为 NULL 时补为空列表。
+
+    PostgreSQL 的 ``json_agg`` 对空集合返回 NULL，SQLite 返回 ``[]``，此处统一。
+    """
+    items = []
+    for row in rows:
+        item = row._asdict()
+        for key in json_lists:
+            if item.get(key) is None:
+                item[key] = []
+        items.append(item)
+    return items
@@ -1,10 +1,61 @@
-"""统一 API 响应格式。"""
+"""统一 API 响应格式。
 
-from datetime import datetime, timezone
+所有响应均为 ``{code, message, data, timestamp}`` 信封。``success`` / ``error`` 直接构造
+字典；``page_response`` 与 ``json_response`` 返回预编码的 :class:`FastJSONResponse`，
+一次序列化为字节，跳过 FastAPI 对返回值的 ``jsonable_encoder`` 遍历。大列表、树等
+载荷较大的接口应优先使用后者。
+"""
+
+import json
+from datetime import date, datetime, time, timezone
+from decimal import Decimal
+from enum import Enum
 from typing import Any, Optional
+from uuid import UUID
 
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 
+try:
+    import orjson
+except ImportError:  # orjson 为可选依赖，缺失时退回标准库
+    orjson = None
+
+
+def _default(value: Any) -> Any:
+    """序列化 JSON 原生不支持的类型（与 ``jsonable_encoder`` 的输出保持一致）。"""
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return int(value) if value.as_tuple().exponent >= 0 else float(value)
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    if isinstance(value, bytes):
+        return value.decode()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """将内容序列化为紧凑 UTF-8 JSON 字节。"""
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, separators=(",", ":"), default=_default
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """预编码 JSON 响应：优先使用 orjson，一次编码为字节。"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
 
 class ApiResponse(BaseModel):
     """标准 API 响应包装。"""
@@ -21,30 +72,65 @@ class ApiResponse(BaseModel):
 
 
 class PageData(BaseModel):
-    """分页数据包装。"""
+    """分页数据包装。
+
+    ``total`` 在未统计总数时为 None；``next_cursor`` 仅在游标分页模式下有值。
+    """
 
     items: list[Any] = []
-    total: int = 0
+    total: Optional[int] = 0
     page: int = 1
     page_size: int = 20
+    next_cursor: Optional[str] = None
+
+
+def _envelope(code: int, message: str, data: Any) -> dict:
+    """构建响应信封（字段与 :class:`ApiResponse` 一致）。"""
+    return {
+        "code": code,
+        "message": message,
+        "data": data,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+    }
 
 
 def success(data: Any = None, message: str = "success") -> dict:
     """构建成功响应。"""
-    return ApiResponse(code=200, message=message, data=data).model_dump()
+    return _envelope(200, message, data)
 
 
 def error(code: int = 400, message: str = "error") -> dict:
     """构建错误响应。"""
-    return ApiResponse(code=code, message=message).model_dump()
+    return _envelope(code, message, None)
+
+
+def json_response(
+    data: Any = None,
+    message: str = "success",
+    code: int = 200,
+    status_code: int = 200,
+    headers: Optional[dict[str, str]] = None,
+) -> FastJSONResponse:
+    """构建预编码的成功响应（直接返回给 FastAPI，不再经过 jsonable_encoder）。"""
+    return FastJSONResponse(
+        content=_envelope(code, message, data), status_code=status_code, headers=headers
+    )
 
 
 def page_response(
-    items: list, total: int, page: int, page_size: int
-) -> dict:
-    """构建分页响应。"""
-    return success(
-        data=PageData(
-            items=items, total=total, page=page, page_size=page_size
-        ).model_dump()
+    items: list,
+    total: Optional[int],
+    page: int,
+    page_size: int,
+    next_cursor: Optional[str] = None,
+) -> FastJSONResponse:
+    """构建分页响应（预编码，字段与 :class:`PageData` 一致）。"""
+    return json_response(
+        data={
+            "items": items,
+            "total": total,
+            "page": page,
+            "page_size": page_size,
+            "next_cursor": next_cursor,
+        }
     )
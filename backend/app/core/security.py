@@ -6,30 +6,38 @@ from typing import Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
-import bcrypt
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 
+from app.core.cache import TieredCache
 from app.core.config import get_settings
-from app.core.database import get_db
+from app.core.database import read_session_factory
+from app.core.event_bus import event_bus
+from app.core.hashing import hash_password, password_hasher, verify_password  # noqa: F401
+from app.schemas.auth import Principal
 
 settings = get_settings()
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
+# 认证主体缓存：user_id -> Principal，用户变更时经事件总线失效
+principal_cache = TieredCache(
+    "principal",
+    maxsize=settings.principal_cache_size,
+    ttl=settings.principal_cache_ttl,
+    encoder=lambda p: p.model_dump(),
+    decoder=Principal.model_validate,
+)
 
-def hash_password(password: str) -> str:
-    """对明文密码进行 bcrypt 哈希。"""
-    salt = bcrypt.gensalt()
-    pwd_bytes = password.encode('utf-8')
-    return bcrypt.hashpw(pwd_bytes, salt).decode('utf-8')
 
+async def _invalidate_principal(_: str, data: dict) -> None:
+    """用户被修改/删除后失效其认证缓存。"""
+    await principal_cache.delete(int(data["id"]))
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """验证明文密码与哈希是否匹配。"""
-    plain_bytes = plain_password.encode('utf-8')
-    hashed_bytes = hashed_password.encode('utf-8')
-    return bcrypt.checkpw(plain_bytes, hashed_bytes)
+
+event_bus.subscribe("user.updated", _invalidate_principal)
+event_bus.subscribe("user.deleted", _invalidate_principal)
 
 
 def create_access_token(
@@ -74,13 +82,48 @@ def decode_token(token: str) -> dict:
         )
 
 
+async def load_principal(db: AsyncSession, user_id: int) -> Optional[Principal]:
+    """读取用户认证快照，优先命中缓存；用户不存在时返回 None。"""
+    from app.models.user import User
+
+    principal = await principal_cache.get(user_id)
+    if principal is not None:
+        return principal
+
+    result = await db.execute(
+        select(User).options(selectinload(User.roles)).where(User.id == user_id)
+    )
+    user = result.scalar_one_or_none()
+    if user is None:
+        return None
+
+    principal = Principal(
+        id=user.id,
+        username=user.username,
+        real_name=user.real_name,
+        avatar=user.avatar,
+        is_active=user.is_active,
+        department_id=user.department_id,
+        role_ids=[r.id for r in user.roles],
+    )
+    await principal_cache.set(user_id, principal)
+    return principal
+
+
+async def _principal_db() -> AsyncSession:
+    """认证专用的主库只读会话：不计入插件的数据库份额，命中缓存时不取连接。"""
+    async with read_session_factory() as session:
+        yield session
+
+
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
-    db: AsyncSession = Depends(get_db),
-):
-    """FastAPI 依赖：从 Token 解析当前登录用户。"""
-    from app.models.user import User
+    db: AsyncSession = Depends(_principal_db),
+) -> Principal:
+    """FastAPI 依赖：从 Token 解析当前登录用户。
 
+    返回缓存的 :class:`Principal` 快照，命中缓存时不访问数据库。
+    """
     payload = decode_token(token)
     if payload.get("type") != "access":
         raise HTTPException(
@@ -95,8 +138,7 @@ async def get_current_user(
             detail="Token 中缺少用户标识",
         )
 
-    result = await db.execute(select(User).where(User.id == int(user_id)))
-    user = result.scalar_one_or_none()
+    user = await load_principal(db, int(user_id))
 
     if user is None:
         raise HTTPException(
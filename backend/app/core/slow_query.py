@@ -0,0 +1,221 @@
+"""慢查询日志 — 超过阈值的语句连同执行计划记入环形缓冲区。
+
+:meth:`SlowQueryLog.attach` 在引擎上监听 ``before/after_cursor_execute``
+（``app/core/database.py`` 为主库与各只读副本挂载）。单条语句耗时超过
+``SLOW_QUERY_THRESHOLD_MS`` 时记录：
+
+- 规范化后的 SQL（压缩空白、``IN (?, ?, ...)`` 折叠为 ``IN (...)``）及其指纹
+- 截断后的参数、耗时、所属接口（如 ``GET /api/v1/users/{user_id}``）
+- 执行计划：PostgreSQL 为 ``EXPLAIN (ANALYZE off)``，SQLite 为 ``EXPLAIN QUERY PLAN``
+
+执行计划在后台任务中用独立连接获取，不占用请求耗时，也不影响请求所在事务。
+同一指纹在 ``SLOW_QUERY_SAMPLE_SECONDS`` 内只采集一次，其余只累加次数与最大耗时。
+结果通过 ``GET /api/v1/monitor/slow-queries`` 查看。
+"""
+
+import asyncio
+import hashlib
+import logging
+import re
+import time
+from collections import OrderedDict, deque
+from contextvars import Context, ContextVar
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import get_settings
+from app.core.sql_instrumentation import current_endpoint
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+_START_KEY = "slow_query_start"
+
+# 参数中字符串值保留的长度
+PARAM_MAX_LENGTH = 64
+
+# 可以安全 EXPLAIN 的语句（不执行，只生成计划）
+_EXPLAINABLE = ("select", "with", "update", "delete")
+
+_EXPLAIN_PREFIX = {
+    "postgresql": "EXPLAIN (ANALYZE off) ",
+    "sqlite": "EXPLAIN QUERY PLAN ",
+    "mysql": "EXPLAIN ",
+}
+
+# 占位符：? / $1 / $1::INTEGER / %(name)s / %s / :name
+_PLACEHOLDER = r"(?:\?|\$\d+(?:::\w+)?|%\(\w+\)s|%s|:\w+)"
+_IN_LIST = re.compile(rf"\bIN \(\s*{_PLACEHOLDER}(?:\s*,\s*{_PLACEHOLDER})*\s*\)", re.IGNORECASE)
+
+# 获取执行计划时跳过自身的计时
+_explaining: ContextVar[bool] = ContextVar("slow_query_explaining", default=False)
+
+
+def normalize_sql(statement: str) -> str:
+    """压缩空白并折叠 IN 列表，使同一语句的不同参数个数得到相同文本。"""
+    return _IN_LIST.sub("IN (...)", " ".join(statement.split()))
+
+
+def fingerprint(normalized: str) -> str:
+    """规范化 SQL 的指纹。"""
+    return hashlib.sha1(normalized.encode()).hexdigest()[:16]
+
+
+def _plain(value: Any) -> Any:
+    """把参数转为可序列化、长度受限的值。"""
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return f"<{len(value)} bytes>"
+    text = value.isoformat() if isinstance(value, datetime) else str(value)
+    return text if len(text) <= PARAM_MAX_LENGTH else text[:PARAM_MAX_LENGTH] + "..."
+
+
+def _normalize_params(parameters: Any) -> Any:
+    if isinstance(parameters, dict):
+        return {k: _plain(v) for k, v in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [_plain(v) for v in parameters]
+    return _plain(parameters)
+
+
+class SlowQueryLog:
+    """慢查询环形缓冲区。
+
+    :param threshold_ms: 慢查询阈值（毫秒），0 表示关闭
+    :param capacity: 缓冲区保留的条数
+    :param sample_seconds: 同一指纹两次采集的最小间隔（秒）
+    """
+
+    def __init__(self, threshold_ms: float = 200, capacity: int = 200, sample_seconds: float = 60):
+        self.threshold = threshold_ms / 1000
+        self.sample_seconds = sample_seconds
+        self._entries: deque[dict] = deque(maxlen=capacity)
+        # 指纹 → (最近采集时间, 条目)，按采集先后淘汰
+        self._recent: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self._max_recent = capacity * 4
+        self._tasks: set[asyncio.Task] = set()
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold > 0
+
+    def attach(self, engine: AsyncEngine) -> None:
+        """在引擎上挂载计时监听（阈值为 0 时不挂载）。"""
+        if not self.enabled:
+            return
+        event.listen(engine.sync_engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine.sync_engine, "after_cursor_execute", self._after_cursor_execute)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault(_START_KEY, []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get(_START_KEY)
+        if not starts:
+            return
+        elapsed = time.perf_counter() - starts.pop()
+        if elapsed >= self.threshold and not _explaining.get():
+            self.record(conn, statement, parameters, elapsed, executemany)
+
+    def record(
+        self,
+        conn: Connection,
+        statement: str,
+        parameters: Any,
+        elapsed: float,
+        executemany: bool = False,
+    ) -> None:
+        """记录一条慢查询（同一指纹在采样间隔内只累加次数）。"""
+        normalized = normalize_sql(statement)
+        key = fingerprint(normalized)
+        now = time.monotonic()
+        elapsed_ms = round(elapsed * 1000, 2)
+
+        recent = self._recent.get(key)
+        if recent is not None and now - recent[0] < self.sample_seconds:
+            entry = recent[1]
+            entry["occurrences"] += 1
+            entry["max_ms"] = max(entry["max_ms"], elapsed_ms)
+            return
+
+        entry = {
+            "fingerprint": key,
+            "sql": normalized,
+            "params": None if executemany else _normalize_params(parameters),
+            "duration_ms": elapsed_ms,
+            "max_ms": elapsed_ms,
+            "occurrences": 1,
+            "endpoint": current_endpoint(),
+            "engine": conn.engine.url.render_as_string(hide_password=True),
+            "captured_at": datetime.now(timezone.utc).isoformat(),
+            "plan": None,
+            "plan_error": None,
+        }
+        self._entries.append(entry)
+        self._recent[key] = (now, entry)
+        self._recent.move_to_end(key)
+        while len(self._recent) > self._max_recent:
+            self._recent.popitem(last=False)
+        logger.warning("慢查询 %.1f ms [%s] %s", elapsed_ms, entry["endpoint"] or "-", normalized[:200])
+
+        if not executemany:
+            self._schedule_explain(conn, statement, parameters, entry)
+
+    def _schedule_explain(self, conn: Connection, statement: str, parameters: Any, entry: dict) -> None:
+        """在后台任务中获取执行计划。"""
+        prefix = _EXPLAIN_PREFIX.get(conn.dialect.name)
+        if prefix is None or not statement.lstrip().lower().startswith(_EXPLAINABLE):
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        # 新的空上下文：EXPLAIN 不计入请求的 SQL 统计
+        task = loop.create_task(
+            self._explain(AsyncEngine(conn.engine), prefix + statement, parameters, entry),
+            context=Context(),
+        )
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _explain(self, engine: AsyncEngine, sql: str, parameters: Any, entry: dict) -> None:
+        _explaining.set(True)
+        try:
+            async with engine.connect() as conn:
+                result = await conn.exec_driver_sql(sql, parameters)
+                # PostgreSQL 每行一列；SQLite 的计划描述在最后一列
+                entry["plan"] = [str(row[-1]) for row in result.all()]
+        except Exception as e:
+            entry["plan_error"] = str(e)[:500]
+
+    def entries(self, limit: Optional[int] = None) -> list[dict]:
+        """最近的慢查询（新的在前）。"""
+        items = list(reversed(self._entries))
+        return items if limit is None else items[:limit]
+
+    def clear(self) -> None:
+        """清空缓冲区。"""
+        self._entries.clear()
+        self._recent.clear()
+
+    def snapshot(self) -> dict:
+        """导出配置与条数（监控用）。"""
+        return {
+            "enabled": self.enabled,
+            "threshold_ms": self.threshold * 1000,
+            "sample_seconds": self.sample_seconds,
+            "entries": len(self._entries),
+        }
+
+
+slow_query_log = SlowQueryLog(
+    threshold_ms=settings.slow_query_threshold_ms,
+    capacity=settings.slow_query_log_size,
+    sample_seconds=settings.slow_query_sample_seconds,
+)
@@ -0,0 +1,229 @@
+"""按请求统计 SQL — 查询次数、数据库耗时、最慢语句与 N+1 检测。
+
+在全局 ``Engine`` 上监听 ``before/after_cursor_execute``（主库、只读副本都覆盖），
+把每条语句的耗时记入当前上下文的 :class:`SQLStats`（``ContextVar``，随请求隔离）。
+
+:class:`SQLInstrumentationMiddleware` 为每个 HTTP 请求建立统计，并：
+
+- 在响应头追加 ``Server-Timing``（浏览器开发者工具可直接查看）::
+
+      Server-Timing: db;dur=12.3;desc="8 queries", db-slowest;dur=4.1, app;dur=30.2
+
+- 请求结束后输出一行 JSON 结构化日志（仅统计发起过查询的请求）
+- 开发环境下，同一条语句在一个请求内执行次数达到 ``SQL_N_PLUS_ONE_THRESHOLD``
+  时记录 WARNING，提示疑似 N+1
+
+请求之外的代码（如启动初始化）可以用 :func:`track_sql` 统计一段逻辑::
+
+    async with track_sql("seed_default_data"):
+        await seed_default_data()
+
+注意：``Server-Timing`` 在响应头发出时计算，流式响应发送响应体期间的查询只计入日志。
+未捕获异常的 500 响应由 Starlette 最外层的 ``ServerErrorMiddleware`` 生成，不经过本中间件，
+同样只有日志（``status`` 记为 500）。
+"""
+
+import json
+import logging
+import time
+from collections import Counter
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+# 日志中最慢语句保留的长度
+SLOWEST_SQL_MAX_LENGTH = 200
+
+_START_KEY = "sql_instrumentation_start"
+
+
+class SQLStats:
+    """一个请求（或一段代码）内的 SQL 统计。"""
+
+    def __init__(self, scope: Optional[Scope] = None):
+        self.scope = scope
+        self.count = 0
+        self.total = 0.0
+        self.slowest = 0.0
+        self.slowest_sql: Optional[str] = None
+        self.statements: Counter[str] = Counter()
+
+    def record(self, statement: str, elapsed: float) -> None:
+        """记录一条语句。"""
+        self.count += 1
+        self.total += elapsed
+        self.statements[statement] += 1
+        if elapsed > self.slowest:
+            self.slowest = elapsed
+            self.slowest_sql = statement
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        """执行次数不少于 ``threshold`` 的语句（疑似 N+1）。"""
+        return [(sql, n) for sql, n in self.statements.most_common() if n >= threshold]
+
+    def to_dict(self) -> dict:
+        """导出为日志字段（毫秒）。"""
+        return {
+            "queries": self.count,
+            "db_ms": round(self.total * 1000, 2),
+            "slowest_ms": round(self.slowest * 1000, 2),
+            "slowest_sql": _shorten(self.slowest_sql),
+        }
+
+
+_current_stats: ContextVar[Optional[SQLStats]] = ContextVar("sql_stats", default=None)
+
+
+def current_sql_stats() -> Optional[SQLStats]:
+    """当前上下文的 SQL 统计；不在请求 / :func:`track_sql` 中时为 None。"""
+    return _current_stats.get()
+
+
+def current_endpoint() -> Optional[str]:
+    """当前请求的接口，如 ``GET /api/v1/users/{user_id}``（路由匹配前为实际路径）。"""
+    stats = _current_stats.get()
+    if stats is None or stats.scope is None:
+        return None
+    scope = stats.scope
+    route = scope.get("route")
+    # 挂载的子应用（如插件）中路由路径相对于 root_path
+    path = scope.get("root_path", "") + route.path if route is not None else scope["path"]
+    return f"{scope['method']} {path}"
+
+
+def _shorten(statement: Optional[str]) -> Optional[str]:
+    """压缩空白并截断语句。"""
+    if statement is None:
+        return None
+    statement = " ".join(statement.split())
+    if len(statement) > SLOWEST_SQL_MAX_LENGTH:
+        statement = statement[:SLOWEST_SQL_MAX_LENGTH] + "..."
+    return statement
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_stats.get() is not None:
+        conn.info.setdefault(_START_KEY, []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_stats.get()
+    starts = conn.info.get(_START_KEY)
+    if stats is None or not starts:
+        return
+    stats.record(statement, time.perf_counter() - starts.pop())
+
+
+def _warn_n_plus_one(stats: SQLStats, label: str, threshold: int) -> None:
+    """记录疑似 N+1 的重复语句。"""
+    for statement, times in stats.repeated(threshold):
+        logger.warning("疑似 N+1 查询: %s 中同一语句执行了 %d 次: %s", label, times, _shorten(statement))
+
+
+def _server_timing(stats: SQLStats, started: float) -> str:
+    """构造 ``Server-Timing`` 头的值。"""
+    app_ms = (time.perf_counter() - started) * 1000
+    return (
+        f'db;dur={stats.total * 1000:.1f};desc="{stats.count} queries", '
+        f"db-slowest;dur={stats.slowest * 1000:.1f}, "
+        f"app;dur={app_ms:.1f}"
+    )
+
+
+@asynccontextmanager
+async def track_sql(label: str, n_plus_one_threshold: int = 0) -> AsyncIterator[SQLStats]:
+    """统计一段代码的 SQL 并在结束时记录日志。
+
+    :param label: 日志中的名称
+    :param n_plus_one_threshold: 大于 0 时检测重复语句
+    """
+    stats = SQLStats()
+    token = _current_stats.set(stats)
+    started = time.perf_counter()
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+        logger.info(
+            "SQL 统计 %s",
+            json.dumps(
+                {"label": label, "total_ms": round((time.perf_counter() - started) * 1000, 2),
+                 **stats.to_dict()},
+                ensure_ascii=False,
+            ),
+        )
+        if n_plus_one_threshold > 0:
+            _warn_n_plus_one(stats, label, n_plus_one_threshold)
+
+
+class SQLInstrumentationMiddleware:
+    """为每个 HTTP 请求统计 SQL，输出 ``Server-Timing`` 头与结构化日志。
+
+    :param report: 是否输出响应头与日志；关闭时仍建立请求上下文（慢查询日志据此记录接口）
+    :param n_plus_one_threshold: 大于 0 时启用 N+1 检测（建议仅在开发环境开启）
+    """
+
+    def __init__(self, app: ASGIApp, report: bool = True, n_plus_one_threshold: int = 0):
+        self.app = app
+        self.report = report
+        self.n_plus_one_threshold = n_plus_one_threshold
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = SQLStats(scope)
+        token = _current_stats.set(stats)
+        if not self.report:
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                _current_stats.reset(token)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", _server_timing(stats, started))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_stats.reset(token)
+            if stats.count:
+                self._log(scope, status_code, stats, started)
+
+    def _log(self, scope: Scope, status_code: int, stats: SQLStats, started: float) -> None:
+        """输出请求的 SQL 统计日志。"""
+        label = f"{scope['method']} {scope['path']}"
+        logger.info(
+            "SQL 统计 %s",
+            json.dumps(
+                {
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "status": status_code,
+                    "total_ms": round((time.perf_counter() - started) * 1000, 2),
+                    **stats.to_dict(),
+                },
+                ensure_ascii=False,
+            ),
+        )
+        if self.n_plus_one_threshold > 0:
+            _warn_n_plus_one(stats, label, self.n_plus_one_threshold)
@@ -0,0 +1,110 @@
+"""应用启动辅助 — 表结构检查、种子数据互斥与分阶段计时。
+
+多 worker 滚动重启时，每个 worker 都会执行启动流程。``STARTUP_MODE=fast``（默认）下：
+
+- 先比较数据库 ``alembic_version`` 与代码中的迁移 head，一致时只用一次查询核对
+  ``Base.metadata`` 中的表是否都已存在，仅为缺失的表（如迁移尚未覆盖的插件表）执行
+  ``create_all``；不一致或未使用 Alembic 时照常建表
+- 种子数据在 PostgreSQL 事务级 advisory lock 下执行，同一时刻只有一个 worker 写入，
+  其余 worker 等待后发现数据已存在直接返回
+
+``STARTUP_MODE=full`` 始终执行 ``create_all``，与早期行为一致。
+各阶段耗时由 :class:`StartupTimer` 记录到日志。
+"""
+
+import json
+import logging
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import MetaData, inspect, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+logger = logging.getLogger(__name__)
+
+STARTUP_FAST = "fast"
+STARTUP_FULL = "full"
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent.parent
+
+# 种子数据的 advisory lock 键（全库唯一的常量即可）
+SEED_LOCK_KEY = 0x0A_5EED
+
+
+class StartupTimer:
+    """按阶段记录启动耗时。"""
+
+    def __init__(self):
+        self._started = time.perf_counter()
+        self.phases: dict[str, float] = {}
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """记录一个阶段的耗时。"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = (time.perf_counter() - started) * 1000
+            self.phases[name] = round(elapsed, 1)
+            logger.info("启动阶段 %s: %.1f ms", name, elapsed)
+
+    def summary(self) -> None:
+        """输出启动总耗时与各阶段明细。"""
+        total = (time.perf_counter() - self._started) * 1000
+        logger.info("启动完成: %.1f ms %s", total, json.dumps(self.phases, ensure_ascii=False))
+
+
+def migration_heads() -> set[str]:
+    """代码中的 Alembic 迁移 head。"""
+    config = Config(str(BACKEND_DIR / "alembic.ini"))
+    config.set_main_option("script_location", str(BACKEND_DIR / "migrations"))
+    return set(ScriptDirectory.from_config(config).get_heads())
+
+
+def _database_state(sync_conn) -> tuple[set[str], set[str]]:
+    """数据库 ``alembic_version`` 中的版本（表不存在时为空）与已有的表名。"""
+    revisions = set(MigrationContext.configure(sync_conn).get_current_heads())
+    return revisions, set(inspect(sync_conn).get_table_names())
+
+
+async def ensure_schema(engine: AsyncEngine, metadata: MetaData, mode: str = STARTUP_FAST) -> None:
+    """确保表结构存在；fast 模式下数据库已是最新迁移版本时只为缺失的表执行 ``create_all``。"""
+    if mode == STARTUP_FAST:
+        heads = migration_heads()
+        async with engine.connect() as conn:
+            current, existing = await conn.run_sync(_database_state)
+        if heads and current == heads:
+            missing = [table for table in metadata.tables.values() if table.name not in existing]
+            if not missing:
+                logger.info("数据库已是最新迁移版本 %s，跳过 create_all", ",".join(sorted(current)))
+                return
+            logger.warning(
+                "数据库已是最新迁移版本，但缺少表 %s（迁移未覆盖或未执行），仅为这些表执行 create_all",
+                ",".join(table.name for table in missing),
+            )
+            async with engine.begin() as conn:
+                await conn.run_sync(metadata.create_all, tables=missing)
+            return
+        logger.info(
+            "数据库迁移版本 %s 与代码 %s 不一致，执行 create_all",
+            ",".join(sorted(current)) or "(无)",
+            ",".join(sorted(heads)),
+        )
+
+    async with engine.begin() as conn:
+        await conn.run_sync(metadata.create_all)
+
+
+async def acquire_advisory_lock(db: AsyncSession, key: int) -> None:
+    """在当前事务中获取 advisory lock，提交或回滚时自动释放。
+
+    仅 PostgreSQL 生效；其它数据库（SQLite 开发环境）为空操作。
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        await db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": key})
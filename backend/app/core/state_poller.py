@@ -0,0 +1,69 @@
+"""进程内状态的数据库轮询兜底。
+
+权限位图、数据范围、部门/菜单树等进程内状态由事件总线上的变更事件维护。未启用
+Redis 事件中继时，事件只到达处理写请求的 worker，其它 worker 依赖本模块每
+``AUTHZ_POLL_SECONDS`` 秒从数据库刷新一次，状态最多滞后一个轮询周期。
+
+各模块在导入时注册刷新函数，刷新函数接收数据库会话，自行判断数据是否变化::
+
+    state_poller.register("permissions", _refresh_permissions)
+"""
+
+import asyncio
+import logging
+from typing import Awaitable, Callable, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+logger = logging.getLogger(__name__)
+
+Refresher = Callable[[AsyncSession], Awaitable[None]]
+
+
+class StatePoller:
+    """按固定间隔依次执行已注册的刷新函数。"""
+
+    def __init__(self):
+        self._refreshers: dict[str, Refresher] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def register(self, name: str, refresher: Refresher) -> None:
+        """注册刷新函数（同名覆盖）。"""
+        self._refreshers[name] = refresher
+
+    async def refresh(self, session_factory: async_sessionmaker) -> None:
+        """在同一个会话中执行全部刷新函数，单个失败不影响其它。"""
+        async with session_factory() as db:
+            for name, refresher in self._refreshers.items():
+                try:
+                    await refresher(db)
+                except Exception as e:
+                    logger.warning("刷新 %s 失败: %s", name, e)
+                    await db.rollback()
+
+    async def _poll(self, session_factory: async_sessionmaker, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.refresh(session_factory)
+            except Exception as e:
+                logger.warning("轮询进程内状态失败: %s", e)
+
+    def start(self, session_factory: async_sessionmaker, interval: float) -> None:
+        """启动后台轮询（``interval`` 不大于 0 时不启动）。"""
+        if interval > 0 and self._task is None:
+            self._task = asyncio.create_task(self._poll(session_factory, interval))
+
+    async def stop(self) -> None:
+        """停止后台轮询。"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# 全局轮询器单例
+state_poller = StatePoller()
@@ -14,14 +14,22 @@ from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy import select
 
 from app.api import api_router
+from app.core.cache import close_redis, get_redis
+from app.core.data_scope import data_scope_compiler
 from app.core.config import get_settings
 from app.core.database import async_session_factory
+from app.core.event_bus import RedisEventRelay, event_bus
+from app.core.permissions import permission_registry
 from app.core.exceptions import register_exception_handlers
 from app.core.plugin_engine import plugin_engine
-from app.core.security import hash_password
+from app.core.plugin_state import PluginGateMiddleware, plugin_state
+from app.core.security import password_hasher
+from app.core.state_poller import state_poller
+from app.core.sql_instrumentation import SQLInstrumentationMiddleware, track_sql
+from app.core.startup import SEED_LOCK_KEY, StartupTimer, acquire_advisory_lock, ensure_schema
 from app.models import Base, User, Role, Menu, Permission
 from app.models.user import user_roles, role_menus
-from app.core.database import engine
+from app.core.database import engine, replica_router
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -32,6 +40,9 @@ settings = get_settings()
 async def seed_default_data() -> None:
     """首次启动时创建默认管理员、admin 角色和系统菜单。"""
     async with async_session_factory() as db:
+        # 多 worker 同时启动时只有一个执行初始化，其余等待后发现管理员已存在
+        await acquire_advisory_lock(db, SEED_LOCK_KEY)
+
         # 检查是否已有管理员
         result = await db.execute(
             select(User).where(User.username == settings.admin_username)
@@ -54,6 +65,7 @@ async def seed_default_data() -> None:
             Permission(name="菜单查看", code="menu:read", resource="menu", action="read"),
             Permission(name="菜单管理", code="menu:manage", resource="menu", action="manage"),
             Permission(name="插件管理", code="plugin:manage", resource="plugin", action="manage"),
+            Permission(name="运行监控", code="system:monitor", resource="system", action="monitor"),
         ]
         db.add_all(permissions)
         await db.flush()
@@ -105,7 +117,7 @@ async def seed_default_data() -> None:
         # 创建管理员用户
         admin_user = User(
             username=settings.admin_username,
-            hashed_password=hash_password(settings.admin_password),
+            hashed_password=await password_hasher.hash(settings.admin_password),
             real_name="系统管理员",
             is_active=True,
             roles=[admin_role],
@@ -119,23 +131,65 @@ async def seed_default_data() -> None:
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """应用生命周期管理。"""
+    timer = StartupTimer()
+
     # 先发现并加载插件（这样模型才会被导入注册到 Base）
-    plugin_engine.discover()
-    plugin_engine.load_all(app)
+    with timer.phase("plugins"):
+        plugin_engine.discover()
+        plugin_engine.load_all(app, lazy=settings.plugin_lazy_routers)
     logger.info("已加载 %d 个插件", len(plugin_engine.loaded_plugins))
 
-    # 启动：建表 + 种子数据
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-
-    await seed_default_data()
+    # 启动：建表（fast 模式下迁移已是最新则跳过）+ 种子数据
+    with timer.phase("schema"):
+        await ensure_schema(engine, Base.metadata, settings.startup_mode)
+
+    with timer.phase("seed"):
+        async with track_sql("seed_default_data", _n_plus_one_threshold()):
+            await seed_default_data()
+
+    # 编译权限位图（插件声明的权限码同样分配位序号）
+    with timer.phase("permissions"):
+        for manifest in plugin_engine.manifests.values():
+            permission_registry.register_codes(manifest.permissions)
+        async with async_session_factory() as db:
+            await permission_registry.load(db)
+            await data_scope_compiler.load(db)
+            await plugin_state.load(db)
+
+    # 启用 Redis 时跨 worker 转发缓存失效事件
+    relay = None
+    redis_client = get_redis()
+    with timer.phase("background"):
+        if redis_client is not None:
+            relay = RedisEventRelay(event_bus, redis_client)
+            await relay.start()
+        else:
+            # 无事件中继时其它 worker 收不到 plugin.toggled、role.updated 等事件，改为定期轮询
+            plugin_state.start(async_session_factory, settings.plugin_state_poll_seconds)
+            state_poller.start(async_session_factory, settings.authz_poll_seconds)
+
+        await replica_router.start()
+
+    timer.summary()
 
     yield
 
     # 关闭
+    if relay is not None:
+        await relay.stop()
+    await plugin_state.stop()
+    await state_poller.stop()
+    await replica_router.stop()
+    await close_redis()
+    password_hasher.shutdown()
     await engine.dispose()
 
 
+def _n_plus_one_threshold() -> int:
+    """N+1 检测阈值，仅开发环境启用。"""
+    return settings.sql_n_plus_one_threshold if settings.app_env == "development" else 0
+
+
 def create_app() -> FastAPI:
     """创建并配置 FastAPI 应用。"""
     app = FastAPI(
@@ -146,6 +200,9 @@ def create_app() -> FastAPI:
         redoc_url="/redoc",
     )
 
+    # 已禁用插件在路由之前拒绝（位于 CORS 内层，拒绝响应同样带跨域头）
+    app.add_middleware(PluginGateMiddleware)
+
     # CORS
     app.add_middleware(
         CORSMiddleware,
@@ -155,6 +212,15 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
 
+    # SQL 统计（用户中间件的最外层，AppException 等异常处理器的响应带 Server-Timing；
+    # 未捕获异常由更外层的 ServerErrorMiddleware 返回 500，不带该响应头，只在日志中记为 500）。
+    # 关闭输出时仍为慢查询日志提供请求上下文
+    app.add_middleware(
+        SQLInstrumentationMiddleware,
+        report=settings.sql_instrumentation_enabled,
+        n_plus_one_threshold=_n_plus_one_threshold(),
+    )
+
     # 注册异常处理器
     register_exception_handlers(app)
 
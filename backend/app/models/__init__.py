@@ -10,6 +10,7 @@ from app.models.user import (
     user_roles,
     role_permissions,
     role_menus,
+    department_closure,
 )
 from app.models.plugin import PluginRecord
 
@@ -24,4 +25,5 @@ __all__ = [
     "user_roles",
     "role_permissions",
     "role_menus",
+    "department_closure",
 ]
@@ -6,6 +6,7 @@ from sqlalchemy import (
     Boolean,
     Column,
     ForeignKey,
+    Index,
     Integer,
     String,
     Table,
@@ -45,6 +46,16 @@ role_departments = Table(
     Column("department_id", Integer, ForeignKey("departments.id", ondelete="CASCADE"), primary_key=True),
 )
 
+# 部门闭包表：每对 (祖先, 后代) 一行，depth 为层级差（自身为 0）
+department_closure = Table(
+    "department_closure",
+    Base.metadata,
+    Column("ancestor_id", Integer, ForeignKey("departments.id", ondelete="CASCADE"), primary_key=True),
+    Column("descendant_id", Integer, ForeignKey("departments.id", ondelete="CASCADE"), primary_key=True),
+    Column("depth", Integer, nullable=False),
+    Index("ix_department_closure_descendant", "descendant_id", "depth"),
+)
+
 
 # ──────────────────────────── 部门 ────────────────────────────
 
@@ -1,12 +1,13 @@
-from typing import Any
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Any, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, desc
+from sqlalchemy import select
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
+from app.core.pagination import COUNT_MODE_PATTERN, paginate
 from app.core.security import get_current_user
 from app.core.response import success, page_response, error
-from app.models.user import User
+from app.schemas.auth import Principal
 from app.plugins.announcement.models import Announcement
 from app.plugins.announcement.schemas import AnnouncementCreate, AnnouncementRead, AnnouncementUpdate
 
@@ -14,28 +15,32 @@ router = APIRouter()
 
 @router.get("/list", summary="分页获取公告列表")
 async def get_announcements(
-    page: int = 1,
-    page_size: int = 20,
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    with_total: bool = True,
+    count: str = Query("exact", pattern=COUNT_MODE_PATTERN),
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
 ) -> dict:
-    skip = (page - 1) * page_size
-    
-    stmt = select(Announcement).order_by(desc(Announcement.created_at)).offset(skip).limit(page_size)
-    result = await db.execute(stmt)
-    items = result.scalars().all()
-    
-    count_stmt = select(func.count()).select_from(Announcement)
-    total = await db.scalar(count_stmt)
+    order = [(Announcement.created_at, True), (Announcement.id, True)]
+    result = await paginate(
+        db, select(Announcement), order,
+        page=page, page_size=page_size, cursor=cursor, with_total=with_total,
+        count_mode=count,
+    )
     
-    parsed_items = [AnnouncementRead.model_validate(item).model_dump() for item in items]
-    return page_response(items=parsed_items, total=total, page=page, page_size=page_size)
+    parsed_items = [AnnouncementRead.model_validate(item).model_dump() for item in result.items]
+    return page_response(
+        items=parsed_items, total=result.total, page=page, page_size=page_size,
+        next_cursor=result.next_cursor,
+    )
 
 
 @router.post("/publish", summary="发布新公告")
 async def create_announcement(
     data: AnnouncementCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ) -> dict:
     # 鉴权：需要 announcement:write 权限 (在此简化，依赖网关或底座路由过滤)
@@ -55,7 +60,7 @@ async def create_announcement(
 @router.get("/{announcement_id}", summary="获取公告详情")
 async def get_announcement(
     announcement_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ) -> dict:
     result = await db.execute(select(Announcement).where(Announcement.id == announcement_id))
@@ -0,0 +1,26 @@
+"""审批任务的列投影读模型：一条 SQL 取回任务及所属实例标题、发起人姓名。"""
+
+from sqlalchemy import Select, func, select
+from sqlalchemy.orm import aliased
+
+from app.models.user import User
+
+from .models import WorkflowInstance, WorkflowTask
+
+# 实例发起人（与处理人区分的别名）
+Initiator = aliased(User, name="initiator")
+
+
+def task_query() -> Select:
+    """任务行，字段与 WorkflowTaskResponse 一致。"""
+    return (
+        select(
+            WorkflowTask.id, WorkflowTask.instance_id, WorkflowTask.node_id, WorkflowTask.node_name,
+            WorkflowTask.status, WorkflowTask.assignee_id, WorkflowTask.comment,
+            WorkflowTask.created_at, WorkflowTask.handled_at,
+            WorkflowInstance.title.label("title"),
+            func.coalesce(Initiator.real_name, Initiator.username).label("initiator_name"),
+        )
+        .join(WorkflowInstance, WorkflowInstance.id == WorkflowTask.instance_id)
+        .join(Initiator, Initiator.id == WorkflowInstance.initiator_id)
+    )
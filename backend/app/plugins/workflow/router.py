@@ -1,19 +1,29 @@
+from datetime import datetime
+from typing import Optional
+
 from fastapi import APIRouter, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, desc, func
+from sqlalchemy import or_, select
 
-from app.core.database import get_db
+from app.core.data_scope import DataScope, get_data_scope
+from app.core.database import get_db, get_read_db
+from app.core.export import EXPORT_FORMAT_PATTERN, stream_export
+from app.core.pagination import COUNT_MODE_PATTERN, paginate
+from app.core.projection import rows_to_dicts
+from app.core.exceptions import NotFoundException
 from app.core.security import get_current_user
 from app.core.response import success, page_response
 from app.models.user import User
+from app.schemas.auth import Principal
 
 from .models import WorkflowDef, WorkflowInstance, WorkflowTask
 from .schemas import (
     WorkflowDefCreate, WorkflowDefResponse, WorkflowDefUpdate,
     WorkflowInstanceCreate, WorkflowInstanceResponse,
-    WorkflowTaskProcess, WorkflowTaskResponse
+    WorkflowTaskProcess
 )
 from .engine import WorkflowEngine
+from .projections import Initiator, task_query
 
 router = APIRouter()
 
@@ -21,7 +31,7 @@ router = APIRouter()
 # 流程定义 API
 # ========================
 @router.post("/defs")
-async def create_def(body: WorkflowDefCreate, current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+async def create_def(body: WorkflowDefCreate, current_user: Principal = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     """创建流程定义"""
     wf_def = WorkflowDef(
         name=body.name,
@@ -36,19 +46,17 @@ async def create_def(body: WorkflowDefCreate, current_user: User = Depends(get_c
     return success(data=WorkflowDefResponse.model_validate(wf_def).model_dump())
 
 @router.get("/defs")
-async def list_defs(page: int = 1, page_size: int = 10, db: AsyncSession = Depends(get_db)):
-    """获取流程定义列表"""
-    skip = (page - 1) * page_size
-    stmt = select(WorkflowDef).order_by(desc(WorkflowDef.created_at)).offset(skip).limit(page_size)
-    items = (await db.execute(stmt)).scalars().all()
-    total = await db.scalar(select(func.count()).select_from(WorkflowDef))
-    return page_response([WorkflowDefResponse.model_validate(x).model_dump() for x in items], total, page, page_size)
+async def list_defs(page: int = Query(1, ge=1), page_size: int = Query(10, ge=1, le=100), cursor: Optional[str] = None, with_total: bool = True, count: str = Query("exact", pattern=COUNT_MODE_PATTERN), db: AsyncSession = Depends(get_read_db)):
+    """获取流程定义列表（传 cursor 使用游标分页）"""
+    order = [(WorkflowDef.created_at, True), (WorkflowDef.id, True)]
+    result = await paginate(db, select(WorkflowDef), order, page, page_size, cursor, with_total, count_mode=count)
+    return page_response([WorkflowDefResponse.model_validate(x).model_dump() for x in result.items], result.total, page, page_size, result.next_cursor)
 
 # ========================
 # 流程实例 API
 # ========================
 @router.post("/instances")
-async def start_instance(body: WorkflowInstanceCreate, current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+async def start_instance(body: WorkflowInstanceCreate, current_user: Principal = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     """发起流程实例"""
     instance = await WorkflowEngine.start_instance(
         db=db,
@@ -61,31 +69,68 @@ async def start_instance(body: WorkflowInstanceCreate, current_user: User = Depe
     await db.refresh(instance)
     return success(data=WorkflowInstanceResponse.model_validate(instance).model_dump())
 
+@router.get("/instances")
+async def list_instances(page: int = Query(1, ge=1), page_size: int = Query(10, ge=1, le=100), cursor: Optional[str] = None, with_total: bool = True, count: str = Query("exact", pattern=COUNT_MODE_PATTERN), scope: DataScope = Depends(get_data_scope), db: AsyncSession = Depends(get_read_db)):
+    """获取数据权限范围内的全部实例（按发起人及其部门过滤）"""
+    visible = scope.filter(User.department_id, WorkflowInstance.initiator_id)
+    stmt = select(WorkflowInstance).join(User, User.id == WorkflowInstance.initiator_id).where(visible)
+    order = [(WorkflowInstance.created_at, True), (WorkflowInstance.id, True)]
+    result = await paginate(db, stmt, order, page, page_size, cursor, with_total, count_mode=count)
+    return page_response([WorkflowInstanceResponse.model_validate(x).model_dump() for x in result.items], result.total, page, page_size, result.next_cursor)
+
+@router.get("/instances/export")
+async def export_instances(format: str = Query("csv", pattern=EXPORT_FORMAT_PATTERN), start: Optional[datetime] = None, end: Optional[datetime] = None, status: Optional[str] = None, scope: DataScope = Depends(get_data_scope)):
+    """流式导出数据权限范围内的流程实例（可按发起时间区间、状态过滤）"""
+    stmt = (
+        select(WorkflowInstance.id, WorkflowInstance.title, WorkflowInstance.workflow_def_id, WorkflowDef.name.label("workflow_name"),
+               WorkflowInstance.initiator_id, User.username.label("initiator"), WorkflowInstance.status, WorkflowInstance.created_at, WorkflowInstance.end_time)
+        .join(User, User.id == WorkflowInstance.initiator_id)
+        .join(WorkflowDef, WorkflowDef.id == WorkflowInstance.workflow_def_id)
+        .where(scope.filter(User.department_id, WorkflowInstance.initiator_id))
+        .order_by(WorkflowInstance.id)
+    )
+    if start: stmt = stmt.where(WorkflowInstance.created_at >= start)
+    if end: stmt = stmt.where(WorkflowInstance.created_at < end)
+    if status: stmt = stmt.where(WorkflowInstance.status == status)
+    return stream_export(stmt, format, "workflow_instances")
+
 @router.get("/instances/my")
-async def list_my_instances(page: int = 1, page_size: int = 10, current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+async def list_my_instances(page: int = Query(1, ge=1), page_size: int = Query(10, ge=1, le=100), cursor: Optional[str] = None, with_total: bool = True, count: str = Query("exact", pattern=COUNT_MODE_PATTERN), current_user: Principal = Depends(get_current_user), db: AsyncSession = Depends(get_read_db)):
     """获取我发起的实例列表"""
-    skip = (page - 1) * page_size
-    stmt = select(WorkflowInstance).where(WorkflowInstance.initiator_id == current_user.id).order_by(desc(WorkflowInstance.created_at)).offset(skip).limit(page_size)
-    items = (await db.execute(stmt)).scalars().all()
-    count_stmt = select(func.count()).select_from(WorkflowInstance).where(WorkflowInstance.initiator_id == current_user.id)
-    total = await db.scalar(count_stmt)
-    return page_response([WorkflowInstanceResponse.model_validate(x).model_dump() for x in items], total, page, page_size)
+    stmt = select(WorkflowInstance).where(WorkflowInstance.initiator_id == current_user.id)
+    order = [(WorkflowInstance.created_at, True), (WorkflowInstance.id, True)]
+    result = await paginate(db, stmt, order, page, page_size, cursor, with_total, count_mode=count)
+    return page_response([WorkflowInstanceResponse.model_validate(x).model_dump() for x in result.items], result.total, page, page_size, result.next_cursor)
 
 # ========================
 # 流程任务 API
 # ========================
 @router.get("/tasks/todo")
-async def list_my_todos(page: int = 1, page_size: int = 10, current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+async def list_my_todos(page: int = Query(1, ge=1), page_size: int = Query(10, ge=1, le=100), cursor: Optional[str] = None, with_total: bool = True, count: str = Query("exact", pattern=COUNT_MODE_PATTERN), current_user: Principal = Depends(get_current_user), db: AsyncSession = Depends(get_read_db)):
     """获取我的待办任务"""
-    skip = (page - 1) * page_size
-    stmt = select(WorkflowTask).where(WorkflowTask.assignee_id == current_user.id, WorkflowTask.status == "pending").order_by(desc(WorkflowTask.created_at)).offset(skip).limit(page_size)
-    items = (await db.execute(stmt)).scalars().all()
-    count_stmt = select(func.count()).select_from(WorkflowTask).where(WorkflowTask.assignee_id == current_user.id, WorkflowTask.status == "pending")
-    total = await db.scalar(count_stmt)
-    return page_response([WorkflowTaskResponse.model_validate(x).model_dump() for x in items], total, page, page_size)
+    stmt = task_query().where(WorkflowTask.assignee_id == current_user.id, WorkflowTask.status == "pending")
+    order = [(WorkflowTask.created_at, True), (WorkflowTask.id, True)]
+    result = await paginate(db, stmt, order, page, page_size, cursor, with_total, count_mode=count, scalars=False)
+    return page_response(rows_to_dicts(result.items), result.total, page, page_size, result.next_cursor)
+
+@router.get("/tasks/export")
+async def export_tasks(format: str = Query("csv", pattern=EXPORT_FORMAT_PATTERN), start: Optional[datetime] = None, end: Optional[datetime] = None, status: Optional[str] = None, scope: DataScope = Depends(get_data_scope)):
+    """流式导出数据权限范围内的审批任务（按处理人及其部门过滤）"""
+    stmt = (
+        select(WorkflowTask.id, WorkflowTask.instance_id, WorkflowInstance.title.label("instance_title"), WorkflowTask.node_id, WorkflowTask.node_name,
+               WorkflowTask.assignee_id, User.username.label("assignee"), WorkflowTask.status, WorkflowTask.comment, WorkflowTask.created_at, WorkflowTask.handled_at)
+        .join(User, User.id == WorkflowTask.assignee_id)
+        .join(WorkflowInstance, WorkflowInstance.id == WorkflowTask.instance_id)
+        .where(scope.filter(User.department_id, WorkflowTask.assignee_id))
+        .order_by(WorkflowTask.id)
+    )
+    if start: stmt = stmt.where(WorkflowTask.created_at >= start)
+    if end: stmt = stmt.where(WorkflowTask.created_at < end)
+    if status: stmt = stmt.where(WorkflowTask.status == status)
+    return stream_export(stmt, format, "workflow_tasks")
 
 @router.post("/tasks/{task_id}/process")
-async def process_task(task_id: int, body: WorkflowTaskProcess, current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+async def process_task(task_id: int, body: WorkflowTaskProcess, current_user: Principal = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     """处理审批任务"""
     await WorkflowEngine.process_task(
         db=db,
@@ -97,3 +142,12 @@ async def process_task(task_id: int, body: WorkflowTaskProcess, current_user: Us
     )
     await db.commit()
     return success(message="处理成功")
+
+@router.get("/tasks/{task_id}")
+async def get_task(task_id: int, current_user: Principal = Depends(get_current_user), scope: DataScope = Depends(get_data_scope), db: AsyncSession = Depends(get_read_db)):
+    """获取任务详情（处理人本人，或实例发起人在数据权限范围内）"""
+    visible = or_(WorkflowTask.assignee_id == current_user.id, scope.filter(Initiator.department_id, WorkflowInstance.initiator_id))
+    row = (await db.execute(task_query().where(WorkflowTask.id == task_id, visible))).first()
+    if row is None:
+        raise NotFoundException("任务不存在")
+    return success(data=rows_to_dicts([row])[0])
@@ -1,5 +1,7 @@
 """认证相关 Pydantic Schema。"""
 
+from typing import Optional
+
 from pydantic import BaseModel
 
 
@@ -19,3 +21,16 @@ class TokenResponse(BaseModel):
 class RefreshRequest(BaseModel):
     """刷新 Token 请求。"""
     refresh_token: str
+
+
+class Principal(BaseModel):
+    """已认证用户的轻量快照，由 get_current_user 返回并缓存。"""
+    id: int
+    username: str
+    real_name: Optional[str] = None
+    avatar: Optional[str] = None
+    is_active: bool = True
+    department_id: Optional[int] = None
+    role_ids: list[int] = []
+
+    model_config = {"frozen": True}
@@ -3,7 +3,7 @@
 from datetime import datetime
 from typing import Optional
 
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field, field_validator, model_validator
 
 
 class UserBase(BaseModel):
@@ -33,6 +33,43 @@ class UserUpdate(BaseModel):
     role_ids: Optional[list[int]] = None
 
 
+class UserImportRow(BaseModel):
+    """批量导入的单行数据。
+
+    部门可用 ``department_id`` 或部门名称 ``department`` 指定；``roles`` 为角色编码，
+    CSV 中以 ``|``、``,`` 或 ``;`` 分隔。
+    """
+    username: str = Field(min_length=1, max_length=50)
+    password: str = Field(min_length=1)
+    email: Optional[str] = Field(None, max_length=100)
+    phone: Optional[str] = Field(None, max_length=20)
+    real_name: Optional[str] = Field(None, max_length=50)
+    department_id: Optional[int] = None
+    department: Optional[str] = None
+    roles: list[str] = []
+
+    @model_validator(mode="before")
+    @classmethod
+    def _blank_to_none(cls, data):
+        """CSV 空单元格视为未填写。"""
+        if isinstance(data, dict):
+            return {k: (None if isinstance(v, str) and not v.strip() else v)
+                    for k, v in data.items() if k is not None}
+        return data
+
+    @field_validator("roles", mode="before")
+    @classmethod
+    def _split_roles(cls, value):
+        """拆分以分隔符连接的角色编码。"""
+        if value is None:
+            return []
+        if isinstance(value, str):
+            for sep in (",", ";"):
+                value = value.replace(sep, "|")
+            return [code.strip() for code in value.split("|") if code.strip()]
+        return value
+
+
 class UserOut(UserBase):
     """用户响应。"""
     id: int
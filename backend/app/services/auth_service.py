@@ -1,20 +1,37 @@
 """认证服务 — 登录、注册、Token 刷新。"""
 
+import hashlib
+import json
+
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
+from app.core.cache import TTLCache
+from app.core.event_bus import event_bus
 from app.core.exceptions import AppException, NotFoundException
+from app.core.permissions import auth_generation
 from app.core.security import (
     create_access_token,
     create_refresh_token,
     decode_token,
-    hash_password,
-    verify_password,
+    password_hasher,
 )
 from app.models.user import User, Role, Permission, Menu
 from app.schemas.auth import TokenResponse
 
+# /auth/me 载荷缓存：user_id -> (授权代数, 载荷, ETag)
+_user_info_cache = TTLCache(maxsize=10000, ttl=600)
+
+
+async def _invalidate_user_info(_: str, data: dict) -> None:
+    """用户资料变化时丢弃其 /auth/me 缓存。"""
+    _user_info_cache.delete(int(data["id"]))
+
+
+event_bus.subscribe("user.updated", _invalidate_user_info)
+event_bus.subscribe("user.deleted", _invalidate_user_info)
+
 
 class AuthService:
     """认证业务逻辑。"""
@@ -29,7 +46,7 @@ class AuthService:
         )
         user = result.scalar_one_or_none()
 
-        if not user or not verify_password(password, user.hashed_password):
+        if not user or not await password_hasher.verify(password, user.hashed_password):
             raise AppException(code=401, message="用户名或密码错误")
         if not user.is_active:
             raise AppException(code=403, message="用户已被禁用")
@@ -61,6 +78,25 @@ class AuthService:
             refresh_token=create_refresh_token(token_data),
         )
 
+    @staticmethod
+    async def get_cached_user_info(db: AsyncSession, user_id: int) -> tuple[dict, str]:
+        """获取 /auth/me 载荷及其 ETag，按 (用户, 授权代数) 缓存。
+
+        ETag 为载荷内容摘要，与 worker 无关，同样的数据在任意 worker 上得到相同 ETag。
+        """
+        generation = auth_generation.value
+        cached = _user_info_cache.get(user_id)
+        if cached is not None and cached[0] == generation:
+            return cached[1], cached[2]
+
+        info = await AuthService.get_user_info(db, user_id)
+        digest = hashlib.sha1(
+            json.dumps(info, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8")
+        ).hexdigest()
+        etag = f'"{digest}"'
+        _user_info_cache.set(user_id, (generation, info, etag))
+        return info, etag
+
     @staticmethod
     async def get_user_info(db: AsyncSession, user_id: int) -> dict:
         """获取当前用户完整信息（含权限和菜单树）。"""
@@ -92,7 +128,7 @@ class AuthService:
 
         # 查询完整菜单树
         menus_result = await db.execute(
-            select(Menu).where(Menu.id.in_(menu_ids)).order_by(Menu.sort_order)
+            select(Menu).where(Menu.id.in_(menu_ids)).order_by(Menu.sort_order, Menu.id)
         )
         menus = menus_result.scalars().all()
         menu_list = [
@@ -114,7 +150,8 @@ class AuthService:
             "username": user.username,
             "real_name": user.real_name,
             "avatar": user.avatar,
-            "roles": role_names,
-            "permissions": list(permission_codes),
+            # 排序保证载荷（及 ETag）与集合的迭代顺序无关，各 worker 一致
+            "roles": sorted(role_names),
+            "permissions": sorted(permission_codes),
             "menus": menu_list,
         }
@@ -1,50 +1,256 @@
-"""部门服务 — 部门树 CRUD。"""
+"""部门服务 — 部门树 CRUD 与层级查询。
+
+层级关系由闭包表 ``department_closure`` 维护：每对 (祖先, 后代) 一行，
+子树成员、层级深度等查询都是一次带索引的单表查询，无需递归。
+"""
 
 from typing import Optional
 
-from sqlalchemy import select
+from sqlalchemy import Select, delete, exists, func, insert, literal, select, true
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.exceptions import ConflictException, NotFoundException
-from app.models.user import Department
+from app.core.cache import TTLCache
+from app.core.database import publish_after_commit
+from app.core.event_bus import event_bus
+from app.core.exceptions import AppException, NotFoundException
+from app.core.state_poller import state_poller
+from app.models.user import Department, User, department_closure
 from app.schemas.user import DepartmentCreate, DepartmentUpdate
 
+# 部门树缓存，部门增删改提交后失效；其它 worker 上的变更由轮询表指纹发现
+_tree_cache = TTLCache(maxsize=1, ttl=3600)
+_tree_fingerprint: Optional[tuple] = None
+
+
+async def _invalidate_tree(_: str, __: dict) -> None:
+    """部门变更后丢弃缓存的部门树。"""
+    _tree_cache.clear()
+
+
+async def _refresh_tree(db: AsyncSession) -> None:
+    """轮询兜底：部门表的行数或最后更新时间变化时丢弃缓存的部门树。"""
+    global _tree_fingerprint
+    fingerprint = tuple((await db.execute(select(func.count(), func.max(Department.updated_at)))).one())
+    if fingerprint != _tree_fingerprint:
+        _tree_fingerprint = fingerprint
+        _tree_cache.clear()
+
+
+for _event in ("department.created", "department.updated", "department.deleted"):
+    event_bus.subscribe(_event, _invalidate_tree)
+state_poller.register("department_tree", _refresh_tree)
+
 
 class DepartmentService:
     """部门管理业务逻辑。"""
 
     @staticmethod
     async def get_tree(db: AsyncSession) -> list[dict]:
-        """获取部门树。"""
+        """获取部门树（命中缓存时不访问数据库，调用方不得修改返回值）。"""
+        tree = _tree_cache.get("tree")
+        if tree is not None:
+            return tree
+
         result = await db.execute(
-            select(Department).order_by(Department.sort_order)
+            select(
+                Department.id,
+                Department.name,
+                Department.parent_id,
+                Department.sort_order,
+                Department.leader_id,
+            ).order_by(Department.sort_order)
         )
-        departments = result.scalars().all()
-        return DepartmentService._build_tree(departments)
+        tree = DepartmentService._build_tree(result.all())
+        _tree_cache.set("tree", tree)
+        return tree
 
     @staticmethod
-    def _build_tree(departments: list, parent_id: Optional[int] = None) -> list[dict]:
-        """递归构建树形结构。"""
+    def _build_tree(departments: list) -> list[dict]:
+        """单次遍历构建树形结构，同级保持输入顺序。
+
+        父节点不存在的部门不会出现在树中。
+        """
+        nodes = {
+            dept.id: {
+                "id": dept.id,
+                "name": dept.name,
+                "parent_id": dept.parent_id,
+                "sort_order": dept.sort_order,
+                "leader_id": dept.leader_id,
+                "children": [],
+            }
+            for dept in departments
+        }
         tree = []
         for dept in departments:
-            if dept.parent_id == parent_id:
-                node = {
-                    "id": dept.id,
-                    "name": dept.name,
-                    "parent_id": dept.parent_id,
-                    "sort_order": dept.sort_order,
-                    "leader_id": dept.leader_id,
-                    "children": DepartmentService._build_tree(departments, dept.id),
-                }
-                tree.append(node)
+            if dept.parent_id is None:
+                tree.append(nodes[dept.id])
+            elif dept.parent_id in nodes:
+                nodes[dept.parent_id]["children"].append(nodes[dept.id])
         return tree
 
+    # ──────────────────── 层级查询 ────────────────────
+
+    @staticmethod
+    def subtree_ids_query(
+        dept_id: int, include_self: bool = True, max_depth: Optional[int] = None
+    ) -> Select:
+        """构造"某部门及其下级部门 ID"的子查询，可直接嵌入 ``in_()``。"""
+        query = select(department_closure.c.descendant_id).where(
+            department_closure.c.ancestor_id == dept_id
+        )
+        if not include_self:
+            query = query.where(department_closure.c.depth > 0)
+        if max_depth is not None:
+            query = query.where(department_closure.c.depth <= max_depth)
+        return query
+
+    @staticmethod
+    async def get_subtree_ids(
+        db: AsyncSession,
+        dept_id: int,
+        include_self: bool = True,
+        max_depth: Optional[int] = None,
+    ) -> list[int]:
+        """获取部门子树中的全部部门 ID。"""
+        result = await db.execute(
+            DepartmentService.subtree_ids_query(dept_id, include_self, max_depth)
+        )
+        return list(result.scalars().all())
+
+    @staticmethod
+    def subtree_members_query(dept_id: int) -> Select:
+        """构造"某部门及其下级部门全部成员 ID"的查询。"""
+        return select(User.id).where(
+            User.department_id.in_(DepartmentService.subtree_ids_query(dept_id))
+        )
+
+    @staticmethod
+    async def get_subtree_member_ids(db: AsyncSession, dept_id: int) -> list[int]:
+        """获取部门及其下级部门的全部成员 ID。"""
+        result = await db.execute(DepartmentService.subtree_members_query(dept_id))
+        return list(result.scalars().all())
+
+    @staticmethod
+    async def is_in_subtree(db: AsyncSession, dept_id: int, ancestor_id: int) -> bool:
+        """判断 dept_id 是否为 ancestor_id 本身或其下级部门。"""
+        return bool(
+            await db.scalar(
+                select(
+                    exists().where(
+                        department_closure.c.ancestor_id == ancestor_id,
+                        department_closure.c.descendant_id == dept_id,
+                    )
+                )
+            )
+        )
+
+    @staticmethod
+    async def get_depth(db: AsyncSession, dept_id: int) -> int:
+        """获取部门层级深度（顶级部门为 0）。"""
+        depth = await db.scalar(
+            select(func.max(department_closure.c.depth)).where(
+                department_closure.c.descendant_id == dept_id
+            )
+        )
+        if depth is None:
+            raise NotFoundException("部门不存在")
+        return depth
+
+    # ──────────────────── 闭包表维护 ────────────────────
+
+    @staticmethod
+    async def _link_node(db: AsyncSession, dept_id: int, parent_id: Optional[int]) -> None:
+        """为新部门写入闭包行：自身一行 + 复制父部门的全部祖先。"""
+        await db.execute(
+            insert(department_closure).values(
+                ancestor_id=dept_id, descendant_id=dept_id, depth=0
+            )
+        )
+        if parent_id is not None:
+            await db.execute(
+                insert(department_closure).from_select(
+                    ["ancestor_id", "descendant_id", "depth"],
+                    select(
+                        department_closure.c.ancestor_id,
+                        literal(dept_id),
+                        department_closure.c.depth + 1,
+                    ).where(department_closure.c.descendant_id == parent_id),
+                )
+            )
+
+    @staticmethod
+    async def _move_subtree(
+        db: AsyncSession, dept_id: int, new_parent_id: Optional[int]
+    ) -> None:
+        """整棵子树移动到新父部门下：先断开旧祖先，再与新祖先做笛卡尔连接。"""
+        if new_parent_id is not None:
+            parent = await db.scalar(select(Department.id).where(Department.id == new_parent_id))
+            if parent is None:
+                raise NotFoundException("上级部门不存在")
+            if await DepartmentService.is_in_subtree(db, new_parent_id, dept_id):
+                raise AppException(code=400, message="不能将部门移动到自身或其下级部门下")
+
+        subtree = DepartmentService.subtree_ids_query(dept_id)
+        await db.execute(
+            delete(department_closure).where(
+                department_closure.c.descendant_id.in_(subtree),
+                department_closure.c.ancestor_id.not_in(subtree),
+            )
+        )
+        if new_parent_id is not None:
+            above = department_closure.alias("above")
+            below = department_closure.alias("below")
+            await db.execute(
+                insert(department_closure).from_select(
+                    ["ancestor_id", "descendant_id", "depth"],
+                    select(
+                        above.c.ancestor_id,
+                        below.c.descendant_id,
+                        above.c.depth + below.c.depth + 1,
+                    )
+                    .select_from(above.join(below, true()))
+                    .where(
+                        above.c.descendant_id == new_parent_id,
+                        below.c.ancestor_id == dept_id,
+                    ),
+                )
+            )
+
+    @staticmethod
+    async def rebuild_closure(db: AsyncSession) -> None:
+        """根据 parent_id 全量重建闭包表（数据修复用）。"""
+        rows = (await db.execute(select(Department.id, Department.parent_id))).all()
+        parents = {dept_id: parent_id for dept_id, parent_id in rows}
+
+        values = []
+        for dept_id in parents:
+            ancestor, depth, seen = dept_id, 0, set()
+            while ancestor is not None and ancestor in parents and ancestor not in seen:
+                seen.add(ancestor)
+                values.append({"ancestor_id": ancestor, "descendant_id": dept_id, "depth": depth})
+                ancestor, depth = parents[ancestor], depth + 1
+
+        await db.execute(delete(department_closure))
+        if values:
+            await db.execute(insert(department_closure), values)
+        publish_after_commit(db, "department.updated", {"id": None})
+
+    # ──────────────────── CRUD ────────────────────
+
     @staticmethod
     async def create(db: AsyncSession, data: DepartmentCreate) -> Department:
         """创建部门。"""
+        if data.parent_id is not None:
+            parent = await db.scalar(select(Department.id).where(Department.id == data.parent_id))
+            if parent is None:
+                raise NotFoundException("上级部门不存在")
+
         dept = Department(**data.model_dump())
         db.add(dept)
         await db.flush()
+        await DepartmentService._link_node(db, dept.id, dept.parent_id)
+        publish_after_commit(db, "department.created", {"id": dept.id})
         return dept
 
     @staticmethod
@@ -59,10 +265,15 @@ class DepartmentService:
         if not dept:
             raise NotFoundException("部门不存在")
 
-        for field, value in data.model_dump(exclude_unset=True).items():
+        update_data = data.model_dump(exclude_unset=True)
+        if "parent_id" in update_data and update_data["parent_id"] != dept.parent_id:
+            await DepartmentService._move_subtree(db, dept.id, update_data["parent_id"])
+
+        for field, value in update_data.items():
             setattr(dept, field, value)
 
         await db.flush()
+        publish_after_commit(db, "department.updated", {"id": dept.id})
         return dept
 
     @staticmethod
@@ -74,4 +285,13 @@ class DepartmentService:
         dept = result.scalar_one_or_none()
         if not dept:
             raise NotFoundException("部门不存在")
+
+        # 子部门随 ORM 级联删除，这里显式清理整棵子树的闭包行（不依赖数据库外键级联）
+        subtree_ids = await DepartmentService.get_subtree_ids(db, dept_id)
+        await db.execute(
+            delete(department_closure).where(
+                department_closure.c.descendant_id.in_(subtree_ids)
+            )
+        )
         await db.delete(dept)
+        publish_after_commit(db, "department.deleted", {"id": dept_id})
@@ -2,46 +2,100 @@
 
 from typing import Optional
 
-from sqlalchemy import select
+from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import TTLCache
+from app.core.database import publish_after_commit
+from app.core.event_bus import event_bus
 from app.core.exceptions import NotFoundException
+from app.core.permissions import auth_generation
+from app.core.state_poller import state_poller
 from app.models.user import Menu
 from app.schemas.user import MenuCreate, MenuUpdate
 
+# 菜单树缓存，菜单增删改提交后失效；其它 worker 上的变更由轮询表指纹发现
+_tree_cache = TTLCache(maxsize=1, ttl=3600)
+_tree_fingerprint: Optional[tuple] = None
+
+
+async def _invalidate_tree(_: str, __: dict) -> None:
+    """菜单变更后丢弃缓存的菜单树。"""
+    _tree_cache.clear()
+
+
+async def _refresh_tree(db: AsyncSession) -> None:
+    """轮询兜底：菜单表的行数或最后更新时间变化时丢弃缓存的菜单树。"""
+    global _tree_fingerprint
+    fingerprint = tuple((await db.execute(select(func.count(), func.max(Menu.updated_at)))).one())
+    if fingerprint != _tree_fingerprint:
+        _tree_fingerprint = fingerprint
+        _tree_cache.clear()
+        # 菜单同样是 /auth/me 载荷的一部分
+        auth_generation.bump()
+
+
+for _event in ("menu.created", "menu.updated", "menu.deleted"):
+    event_bus.subscribe(_event, _invalidate_tree)
+state_poller.register("menu_tree", _refresh_tree)
+
 
 class MenuService:
     """菜单管理业务逻辑。"""
 
     @staticmethod
     async def get_tree(db: AsyncSession) -> list[dict]:
-        """获取完整菜单树。"""
+        """获取完整菜单树（命中缓存时不访问数据库，调用方不得修改返回值）。"""
+        tree = _tree_cache.get("tree")
+        if tree is not None:
+            return tree
+
         result = await db.execute(
-            select(Menu).order_by(Menu.sort_order)
+            select(
+                Menu.id,
+                Menu.name,
+                Menu.path,
+                Menu.icon,
+                Menu.parent_id,
+                Menu.sort_order,
+                Menu.is_visible,
+                Menu.permission_code,
+                Menu.plugin_id,
+                Menu.menu_type,
+            ).order_by(Menu.sort_order)
         )
-        menus = result.scalars().all()
-        return MenuService._build_tree(menus)
+        tree = MenuService._build_tree(result.all())
+        _tree_cache.set("tree", tree)
+        return tree
 
     @staticmethod
-    def _build_tree(menus: list, parent_id: Optional[int] = None) -> list[dict]:
-        """递归构建菜单树。"""
+    def _build_tree(menus: list) -> list[dict]:
+        """单次遍历构建菜单树，同级保持输入顺序。
+
+        父节点不存在的菜单不会出现在树中。
+        """
+        nodes = {
+            menu.id: {
+                "id": menu.id,
+                "name": menu.name,
+                "path": menu.path,
+                "icon": menu.icon,
+                "parent_id": menu.parent_id,
+                "sort_order": menu.sort_order,
+                "is_visible": menu.is_visible,
+                "permission_code": menu.permission_code,
+                "plugin_id": menu.plugin_id,
+                "menu_type": menu.menu_type,
+                "children": [],
+            }
+            for menu in menus
+        }
         tree = []
         for menu in menus:
-            if menu.parent_id == parent_id:
-                node = {
-                    "id": menu.id,
-                    "name": menu.name,
-                    "path": menu.path,
-                    "icon": menu.icon,
-                    "parent_id": menu.parent_id,
-                    "sort_order": menu.sort_order,
-                    "is_visible": menu.is_visible,
-                    "permission_code": menu.permission_code,
-                    "plugin_id": menu.plugin_id,
-                    "menu_type": menu.menu_type,
-                    "children": MenuService._build_tree(menus, menu.id),
-                }
-                tree.append(node)
+            if menu.parent_id is None:
+                tree.append(nodes[menu.id])
+            elif menu.parent_id in nodes:
+                nodes[menu.parent_id]["children"].append(nodes[menu.id])
         return tree
 
     @staticmethod
@@ -50,6 +104,7 @@ class MenuService:
         menu = Menu(**data.model_dump())
         db.add(menu)
         await db.flush()
+        publish_after_commit(db, "menu.created", {"id": menu.id})
         return menu
 
     @staticmethod
@@ -64,6 +119,7 @@ class MenuService:
             setattr(menu, field, value)
 
         await db.flush()
+        publish_after_commit(db, "menu.updated", {"id": menu.id})
         return menu
 
     @staticmethod
@@ -74,3 +130,4 @@ class MenuService:
         if not menu:
             raise NotFoundException("菜单不存在")
         await db.delete(menu)
+        publish_after_commit(db, "menu.deleted", {"id": menu_id})
@@ -3,11 +3,21 @@
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.exceptions import NotFoundException
+from app.core.database import publish_after_commit
+from app.core.event_bus import event_bus
+from app.core.exceptions import AppException, NotFoundException
 from app.core.plugin_engine import plugin_engine
 from app.models.plugin import PluginRecord
 
 
+async def _on_plugin_reload(_: str, data: dict) -> None:
+    """其它 worker 发起的插件重载。"""
+    await plugin_engine.reload(data["name"])
+
+
+event_bus.subscribe("plugin.reload", _on_plugin_reload)
+
+
 class PluginService:
     """插件管理业务逻辑。"""
 
@@ -61,8 +71,23 @@ class PluginService:
             db.add(record)
 
         await db.flush()
+        # 提交后各 worker 更新内存中的插件状态，请求入口据此放行或拒绝
+        publish_after_commit(db, "plugin.toggled", {"name": record.name, "enabled": record.enabled})
         return {"name": record.name, "enabled": record.enabled}
 
+    @staticmethod
+    async def reload(plugin_name: str) -> dict:
+        """热重载插件路由：当前进程立即生效，启用 Redis 中继时通知其它 worker 各自重载。"""
+        if plugin_name not in plugin_engine.loaded_plugins:
+            raise NotFoundException(f"插件 {plugin_name} 未加载")
+
+        result = await plugin_engine.reload(plugin_name)
+        if result is None:
+            raise AppException(code=500, message=f"插件 {plugin_name} 重载失败，请查看日志")
+        if event_bus.relay is not None:
+            await event_bus.relay.send("plugin.reload", {"name": plugin_name})
+        return result
+
     @staticmethod
     async def sync_plugins(db: AsyncSession) -> None:
         """将文件系统发现的插件同步到数据库（首次启动时调用）。"""
@@ -0,0 +1,118 @@
+"""用户、角色的列投影读模型。
+
+列表与详情接口使用这里的查询，一条 SQL 取回所需列及关联集合，返回字典；
+写操作仍通过各 Service 加载 ORM 实体。
+"""
+
+from sqlalchemy import ColumnElement, Select, Table, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.exceptions import NotFoundException
+from app.core.projection import json_array_subquery, json_object_of, rows_to_dicts
+from app.models.user import (
+    Department,
+    Role,
+    User,
+    role_departments,
+    role_menus,
+    role_permissions,
+    user_roles,
+)
+
+
+def _user_roles_column():
+    """用户角色列表 ``[{id, name, code}]``。"""
+    return json_array_subquery(
+        json_object_of(id=Role.id, name=Role.name, code=Role.code),
+        select_from=user_roles.join(Role, Role.id == user_roles.c.role_id),
+        where=user_roles.c.user_id == User.id,
+    ).label("roles")
+
+
+def user_list_query() -> Select:
+    """用户列表行：基本信息 + 部门名称 + 角色。"""
+    return select(
+        User.id,
+        User.username,
+        User.email,
+        User.phone,
+        User.real_name,
+        User.avatar,
+        User.is_active,
+        User.department_id,
+        Department.name.label("department_name"),
+        _user_roles_column(),
+        User.created_at,
+    ).outerjoin(Department, Department.id == User.department_id)
+
+
+def role_list_query() -> Select:
+    """角色列表行：基本信息 + 关联部门 ``[{id, name}]``。"""
+    departments = json_array_subquery(
+        json_object_of(id=Department.id, name=Department.name),
+        select_from=role_departments.join(
+            Department, Department.id == role_departments.c.department_id
+        ),
+        where=role_departments.c.role_id == Role.id,
+    ).label("departments")
+    return select(
+        Role.id,
+        Role.name,
+        Role.code,
+        Role.description,
+        Role.data_scope,
+        departments,
+        Role.created_at,
+    )
+
+
+async def get_user_detail(db: AsyncSession, user_id: int) -> dict:
+    """用户详情。"""
+    row = (
+        await db.execute(
+            select(
+                User.id,
+                User.username,
+                User.email,
+                User.phone,
+                User.real_name,
+                User.avatar,
+                User.is_active,
+                User.department_id,
+                _user_roles_column(),
+            ).where(User.id == user_id)
+        )
+    ).first()
+    if row is None:
+        raise NotFoundException("用户不存在")
+    return rows_to_dicts([row], json_lists=("roles",))[0]
+
+
+def _role_id_list(table: Table, column_name: str) -> ColumnElement:
+    """角色关联表中的 ID 列表。"""
+    return json_array_subquery(
+        table.c[column_name],
+        select_from=table,
+        where=table.c.role_id == Role.id,
+    ).label(f"{column_name}s")
+
+
+async def get_role_detail(db: AsyncSession, role_id: int) -> dict:
+    """角色详情（含部门、权限、菜单 ID 列表）。"""
+    row = (
+        await db.execute(
+            select(
+                Role.id,
+                Role.name,
+                Role.code,
+                Role.description,
+                Role.data_scope,
+                _role_id_list(role_departments, "department_id"),
+                _role_id_list(role_permissions, "permission_id"),
+                _role_id_list(role_menus, "menu_id"),
+            ).where(Role.id == role_id)
+        )
+    ).first()
+    if row is None:
+        raise NotFoundException("角色不存在")
+    return rows_to_dicts([row], json_lists=("department_ids", "permission_ids", "menu_ids"))[0]
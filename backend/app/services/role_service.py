@@ -1,15 +1,18 @@
 """角色服务 — 角色 CRUD。"""
 
+import uuid
 from typing import Optional
 
-from sqlalchemy import func, select
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
+from app.core.database import publish_after_commit
 from app.core.exceptions import ConflictException, NotFoundException
-import uuid
+from app.core.pagination import PageResult, paginate
 from app.models.user import Role, Permission, Menu, Department
 from app.schemas.user import RoleCreate, RoleUpdate
+from app.services.projections import role_list_query
 
 
 class RoleService:
@@ -17,19 +20,30 @@ class RoleService:
 
     @staticmethod
     async def get_list(
-        db: AsyncSession, page: int = 1, page_size: int = 20, keyword: Optional[str] = None
-    ) -> tuple[list[Role], int]:
-        """分页查询角色列表。"""
-        query = select(Role).options(selectinload(Role.departments))
+        db: AsyncSession,
+        page: int = 1,
+        page_size: int = 20,
+        keyword: Optional[str] = None,
+        cursor: Optional[str] = None,
+        with_total: bool = True,
+        count_mode: str = "exact",
+    ) -> PageResult:
+        """分页查询角色列表（``cursor`` 不为 None 时使用游标分页），返回列投影行。"""
+        query = role_list_query()
         if keyword:
             query = query.where(Role.name.ilike(f"%{keyword}%"))
 
-        count_query = select(func.count()).select_from(query.subquery())
-        total = (await db.execute(count_query)).scalar() or 0
-
-        query = query.offset((page - 1) * page_size).limit(page_size)
-        result = await db.execute(query)
-        return list(result.scalars().all()), total
+        return await paginate(
+            db,
+            query,
+            order=[(Role.id, False)],
+            page=page,
+            page_size=page_size,
+            cursor=cursor,
+            with_total=with_total,
+            count_mode=count_mode,
+            scalars=False,
+        )
 
     @staticmethod
     async def get_by_id(db: AsyncSession, role_id: int) -> Role:
@@ -87,6 +101,7 @@ class RoleService:
 
         db.add(role)
         await db.flush()
+        publish_after_commit(db, "role.created", {"id": role.id})
         return role
 
     @staticmethod
@@ -123,6 +138,7 @@ class RoleService:
             setattr(role, field, value)
 
         await db.flush()
+        publish_after_commit(db, "role.updated", {"id": role.id})
         return role
 
     @staticmethod
@@ -130,3 +146,4 @@ class RoleService:
         """删除角色。"""
         role = await RoleService.get_by_id(db, role_id)
         await db.delete(role)
+        publish_after_commit(db, "role.deleted", {"id": role_id})
@@ -0,0 +1,259 @@
+"""用户批量导入服务 — 流式解析 CSV / NDJSON，分批写入。
+
+文件按批读取（默认每批 500 行），每批：
+
+1. 逐行校验（:class:`~app.schemas.user.UserImportRow`），错误行记入报告
+2. 一次查询解析本批涉及的部门与角色（结果跨批缓存），并剔除用户名或邮箱已存在的行
+3. 并行计算密码哈希（:meth:`PasswordHasher.hash_many`，不受登录队列上限拒绝）
+4. 一条 ``INSERT ... ON CONFLICT DO NOTHING RETURNING`` 写入用户，未返回的行即冲突
+5. 一条批量 INSERT 写入用户-角色关联，然后提交
+
+任何时刻内存中只保留一批数据，5 万行级别的 HR 同步也不会撑爆内存。
+"""
+
+import csv
+import io
+import json
+from itertools import islice
+from typing import IO, Any, Iterator, Optional
+
+from pydantic import ValidationError
+from sqlalchemy import insert, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from app.core.database import dispatch_pending_events, mark_tables_written
+from app.core.exceptions import AppException
+from app.core.security import password_hasher
+from app.models.user import Department, Role, User, user_roles
+from app.schemas.user import UserImportRow
+
+IMPORT_BATCH_SIZE = 500
+# 报告中最多保留的错误行数
+MAX_REPORTED_ERRORS = 1000
+
+FORMAT_CSV = "csv"
+FORMAT_NDJSON = "ndjson"
+
+
+def _iter_csv(text: IO[str]) -> Iterator[tuple[int, Any]]:
+    """逐行产出 (行号, 字典)；行号从数据首行记为 1。"""
+    for row_no, row in enumerate(csv.DictReader(text), start=1):
+        yield row_no, row
+
+
+def _iter_ndjson(text: IO[str]) -> Iterator[tuple[int, Any]]:
+    """逐行产出 (行号, 字典或解析异常)，跳过空行。"""
+    for row_no, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield row_no, json.loads(line)
+        except ValueError as exc:
+            yield row_no, exc
+
+
+def _insert_ignoring_conflicts(db: AsyncSession, rows: list[dict]):
+    """按方言构造 ``INSERT ... ON CONFLICT DO NOTHING RETURNING id, username``。"""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        raise AppException(code=500, message=f"批量导入暂不支持数据库: {dialect}")
+    return (
+        dialect_insert(User)
+        .values(rows)
+        .on_conflict_do_nothing()
+        .returning(User.id, User.username)
+    )
+
+
+class ImportReport:
+    """导入结果汇总。"""
+
+    def __init__(self):
+        self.total = 0
+        self.created = 0
+        self.failed = 0
+        self.errors: list[dict] = []
+
+    def fail(self, row_no: int, username: Optional[str], message: str) -> None:
+        """记录一行失败。"""
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"row": row_no, "username": username, "message": message})
+
+    def to_dict(self) -> dict:
+        """导出为响应数据。"""
+        return {
+            "total": self.total,
+            "created": self.created,
+            "failed": self.failed,
+            "errors": sorted(self.errors, key=lambda e: e["row"]),
+            "errors_truncated": self.failed > len(self.errors),
+        }
+
+
+class UserImportService:
+    """用户批量导入业务逻辑。"""
+
+    def __init__(self, db: AsyncSession, batch_size: int = IMPORT_BATCH_SIZE):
+        self.db = db
+        self.batch_size = batch_size
+        self.report = ImportReport()
+        self._seen_usernames: set[str] = set()
+        self._dept_ids: set[int] = set()
+        self._dept_by_name: dict[str, Optional[int]] = {}
+        self._role_by_code: dict[str, Optional[int]] = {}
+
+    async def run(self, raw: IO[bytes], fmt: str) -> dict:
+        """导入整个文件并返回报告。
+
+        :param raw: 二进制文件对象（如 ``UploadFile.file``）
+        :param fmt: ``csv`` 或 ``ndjson``
+        """
+        text = io.TextIOWrapper(raw, encoding="utf-8-sig", newline="")
+        rows = _iter_csv(text) if fmt == FORMAT_CSV else _iter_ndjson(text)
+        try:
+            while True:
+                batch = await run_in_threadpool(lambda: list(islice(rows, self.batch_size)))
+                if not batch:
+                    break
+                await self._import_batch(batch)
+        except (UnicodeDecodeError, csv.Error) as exc:
+            raise AppException(code=400, message=f"文件解析失败: {exc}")
+        finally:
+            text.detach()
+        return self.report.to_dict()
+
+    def _validate(self, batch: list[tuple[int, Any]]) -> list[tuple[int, UserImportRow]]:
+        """校验本批数据，剔除格式错误与文件内重复的用户名。"""
+        valid = []
+        for row_no, raw in batch:
+            self.report.total += 1
+            if isinstance(raw, Exception) or not isinstance(raw, dict):
+                self.report.fail(row_no, None, "行格式错误")
+                continue
+            try:
+                row = UserImportRow.model_validate(raw)
+            except ValidationError as exc:
+                fields = ", ".join(".".join(map(str, e["loc"])) or "-" for e in exc.errors())
+                self.report.fail(row_no, raw.get("username"), f"字段校验失败: {fields}")
+                continue
+            if row.username in self._seen_usernames:
+                self.report.fail(row_no, row.username, "文件内用户名重复")
+                continue
+            self._seen_usernames.add(row.username)
+            valid.append((row_no, row))
+        return valid
+
+    async def _resolve_lookups(self, rows: list[UserImportRow]) -> None:
+        """一次查询解析本批新出现的部门 ID、部门名称与角色编码。"""
+        dept_ids = {r.department_id for r in rows if r.department_id} - self._dept_ids
+        if dept_ids:
+            found = await self.db.scalars(select(Department.id).where(Department.id.in_(dept_ids)))
+            self._dept_ids.update(found.all())
+
+        names = {r.department for r in rows if r.department} - self._dept_by_name.keys()
+        if names:
+            self._dept_by_name.update(dict.fromkeys(names))
+            result = await self.db.execute(
+                select(Department.name, Department.id)
+                .where(Department.name.in_(names))
+                .order_by(Department.id.desc())
+            )
+            # 同名部门取 ID 最小者
+            self._dept_by_name.update(dict(result.all()))
+
+        codes = {c for r in rows for c in r.roles} - self._role_by_code.keys()
+        if codes:
+            self._role_by_code.update(dict.fromkeys(codes))
+            result = await self.db.execute(
+                select(Role.code, Role.id).where(Role.code.in_(codes))
+            )
+            self._role_by_code.update(dict(result.all()))
+
+    async def _existing(self, rows: list[UserImportRow]) -> tuple[set[str], set[str]]:
+        """本批中已存在于数据库的用户名与邮箱（在计算哈希之前剔除）。"""
+        usernames = {r.username for r in rows}
+        emails = {r.email for r in rows if r.email}
+        condition = User.username.in_(usernames)
+        if emails:
+            condition = or_(condition, User.email.in_(emails))
+        result = await self.db.execute(select(User.username, User.email).where(condition))
+        taken_usernames: set[str] = set()
+        taken_emails: set[str] = set()
+        for username, email in result.all():
+            taken_usernames.add(username)
+            if email:
+                taken_emails.add(email)
+        return taken_usernames, taken_emails
+
+    def _department_of(self, row: UserImportRow) -> tuple[Optional[int], Optional[str]]:
+        """返回 (部门 ID, 错误信息)。"""
+        if row.department_id:
+            if row.department_id not in self._dept_ids:
+                return None, f"部门不存在: {row.department_id}"
+            return row.department_id, None
+        if row.department:
+            dept_id = self._dept_by_name.get(row.department)
+            if dept_id is None:
+                return None, f"部门不存在: {row.department}"
+            return dept_id, None
+        return None, None
+
+    async def _import_batch(self, batch: list[tuple[int, Any]]) -> None:
+        """导入一批数据并提交。"""
+        valid = self._validate(batch)
+        if not valid:
+            return
+        await self._resolve_lookups([row for _, row in valid])
+        taken_usernames, taken_emails = await self._existing([row for _, row in valid])
+
+        pending: list[tuple[int, UserImportRow, Optional[int], list[int]]] = []
+        for row_no, row in valid:
+            dept_id, message = self._department_of(row)
+            missing = [c for c in row.roles if self._role_by_code.get(c) is None]
+            if missing:
+                message = f"角色不存在: {', '.join(missing)}"
+            if row.username in taken_usernames or (row.email and row.email in taken_emails):
+                message = "用户名或邮箱已存在"
+            if message:
+                self.report.fail(row_no, row.username, message)
+                continue
+            pending.append((row_no, row, dept_id, [self._role_by_code[c] for c in row.roles]))
+        if not pending:
+            return
+
+        hashes = await password_hasher.hash_many([row.password for _, row, _, _ in pending])
+        values = [
+            {
+                "username": row.username,
+                "email": row.email,
+                "phone": row.phone,
+                "real_name": row.real_name,
+                "department_id": dept_id,
+                "hashed_password": hashed,
+            }
+            for (_, row, dept_id, _), hashed in zip(pending, hashes)
+        ]
+        result = await self.db.execute(_insert_ignoring_conflicts(self.db, values))
+        created = {username: user_id for user_id, username in result.all()}
+
+        links = []
+        for row_no, row, _, role_ids in pending:
+            user_id = created.get(row.username)
+            if user_id is None:
+                self.report.fail(row_no, row.username, "用户名或邮箱已存在")
+                continue
+            links.extend({"user_id": user_id, "role_id": role_id} for role_id in role_ids)
+        if links:
+            await self.db.execute(insert(user_roles), links)
+
+        self.report.created += len(created)
+        mark_tables_written(self.db, User.__tablename__, user_roles.name)
+        # 每批独立提交，长时间导入不占用大事务；提交后立即广播写入事件
+        await self.db.commit()
+        await dispatch_pending_events(self.db)
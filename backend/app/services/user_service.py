@@ -1,15 +1,25 @@
-"""用户服务 — 用户 CRUD 操作。"""
+"""用户服务 — 用户 CRUD 操作与人员搜索。"""
 
+from difflib import SequenceMatcher
 from typing import Optional
 
-from sqlalchemy import func, select
+from sqlalchemy import case, func, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
+from app.core.data_scope import DataScope
+from app.core.database import publish_after_commit
+from app.core.pagination import PageResult, paginate
 from app.core.exceptions import ConflictException, NotFoundException
-from app.core.security import hash_password
+from app.core.security import password_hasher
 from app.models.user import User, Role
 from app.schemas.user import UserCreate, UserUpdate
+from app.services.projections import user_list_query
+
+# 人员搜索匹配的列（PostgreSQL 上均有 pg_trgm GIN 索引）
+SEARCH_COLUMNS = (User.username, User.real_name, User.phone, User.email)
+# 关键词短于 3 个字符时 trigram 无法用于 '%kw%'，只做前缀匹配
+TRGM_MIN_LENGTH = 3
 
 
 class UserService:
@@ -22,12 +32,20 @@ class UserService:
         page_size: int = 20,
         keyword: Optional[str] = None,
         department_id: Optional[int] = None,
-    ) -> tuple[list[User], int]:
-        """分页查询用户列表。"""
-        query = select(User).options(
-            selectinload(User.roles),
-            selectinload(User.department),
-        )
+        scope: Optional[DataScope] = None,
+        cursor: Optional[str] = None,
+        with_total: bool = True,
+        count_mode: str = "exact",
+    ) -> PageResult:
+        """分页查询用户列表，``scope`` 为当前用户的数据范围。
+
+        ``cursor`` 不为 None 时使用游标分页（按 id 升序）；``count_mode`` 见
+        :class:`~app.core.pagination.CountStrategy`。返回列投影行
+        （:func:`~app.services.projections.user_list_query`）。
+        """
+        query = user_list_query()
+        if scope is not None:
+            query = query.where(scope.filter(User.department_id, User.id))
 
         if keyword:
             query = query.where(
@@ -37,17 +55,95 @@ class UserService:
         if department_id:
             query = query.where(User.department_id == department_id)
 
-        # 统计总数
-        count_query = select(func.count()).select_from(query.subquery())
-        total_result = await db.execute(count_query)
-        total = total_result.scalar() or 0
+        return await paginate(
+            db,
+            query,
+            order=[(User.id, False)],
+            page=page,
+            page_size=page_size,
+            cursor=cursor,
+            with_total=with_total,
+            count_mode=count_mode,
+            scalars=False,
+        )
+
+    @staticmethod
+    async def search(
+        db: AsyncSession,
+        keyword: str,
+        limit: int = 20,
+        department_id: Optional[int] = None,
+        scope: Optional[DataScope] = None,
+    ) -> list[dict]:
+        """人员选择器搜索：按用户名、姓名、手机号、邮箱排序匹配。
+
+        排序优先级：完全匹配 > 前缀匹配 > 包含匹配；同级内 PostgreSQL 按
+        ``similarity()`` 排序，其它数据库在 Python 中按相似度排序。
+        """
+        keyword = keyword.strip()
+        if not keyword:
+            return []
+        lowered = keyword.lower()
+
+        exact = or_(*(func.lower(c) == lowered for c in SEARCH_COLUMNS))
+        prefix = or_(*(c.istartswith(keyword, autoescape=True) for c in SEARCH_COLUMNS))
+        if len(keyword) >= TRGM_MIN_LENGTH:
+            matched = or_(*(c.icontains(keyword, autoescape=True) for c in SEARCH_COLUMNS))
+        else:
+            matched = prefix
+        rank = case((exact, 0), (prefix, 1), else_=2)
+
+        query = (
+            select(
+                User.id,
+                User.username,
+                User.real_name,
+                User.avatar,
+                User.department_id,
+                rank.label("rank"),
+            )
+            .where(User.is_active.is_(True), matched)
+        )
+        if scope is not None:
+            query = query.where(scope.filter(User.department_id, User.id))
+        if department_id:
+            query = query.where(User.department_id == department_id)
 
-        # 分页
-        query = query.offset((page - 1) * page_size).limit(page_size)
-        result = await db.execute(query)
-        users = result.scalars().all()
+        if db.get_bind().dialect.name == "postgresql":
+            similarity = func.greatest(
+                *(func.similarity(func.coalesce(c, ""), keyword) for c in SEARCH_COLUMNS)
+            )
+            rows = (
+                await db.execute(
+                    query.order_by(rank, similarity.desc(), User.username).limit(limit)
+                )
+            ).all()
+        else:
+            # 无 similarity()：按等级取出候选后在 Python 中按相似度重排
+            rows = (
+                await db.execute(query.order_by(rank, User.username).limit(limit * 5))
+            ).all()
+            rows.sort(key=lambda row: (row.rank, -UserService._similarity(row, lowered)))
+            rows = rows[:limit]
+
+        return [
+            {
+                "id": row.id,
+                "username": row.username,
+                "real_name": row.real_name,
+                "avatar": row.avatar,
+                "department_id": row.department_id,
+            }
+            for row in rows
+        ]
 
-        return list(users), total
+    @staticmethod
+    def _similarity(row, lowered: str) -> float:
+        """用户名 / 姓名与关键词的最大相似度（非 PostgreSQL 兜底）。"""
+        return max(
+            SequenceMatcher(None, (value or "").lower(), lowered).ratio()
+            for value in (row.username, row.real_name)
+        )
 
     @staticmethod
     async def get_by_id(db: AsyncSession, user_id: int) -> User:
@@ -78,7 +174,7 @@ class UserService:
             real_name=data.real_name,
             avatar=data.avatar,
             department_id=data.department_id,
-            hashed_password=hash_password(data.password),
+            hashed_password=await password_hasher.hash(data.password),
         )
 
         # 关联角色
@@ -100,9 +196,11 @@ class UserService:
         user = await UserService.get_by_id(db, user_id)
         update_data = data.model_dump(exclude_unset=True)
 
+        roles_changed = False
         if "role_ids" in update_data:
             role_ids = update_data.pop("role_ids")
             if role_ids is not None:
+                roles_changed = True
                 roles_result = await db.execute(
                     select(Role).where(Role.id.in_(role_ids))
                 )
@@ -112,6 +210,9 @@ class UserService:
             setattr(user, field, value)
 
         await db.flush()
+        publish_after_commit(
+            db, "user.updated", {"id": user.id, "roles_changed": roles_changed}
+        )
         return user
 
     @staticmethod
@@ -119,3 +220,4 @@ class UserService:
         """删除用户。"""
         user = await UserService.get_by_id(db, user_id)
         await db.delete(user)
+        publish_after_commit(db, "user.deleted", {"id": user_id})
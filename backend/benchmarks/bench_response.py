@@ -0,0 +1,90 @@
+"""响应序列化基准：旧路径（Pydantic 信封 + jsonable_encoder）对比预编码路径。
+
+模拟 ``page_response`` 返回大列表时 FastAPI 的完整序列化流程，不启动服务。
+
+运行（在 backend 目录下）::
+
+    python -m benchmarks.bench_response --items 1000 --rounds 200
+"""
+
+import argparse
+import time
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from app.core.response import ApiResponse, orjson, page_response
+
+
+class _LegacyPageData(BaseModel):
+    """旧版分页数据模型（与 PageData 相同字段）。"""
+
+    items: list[Any] = []
+    total: Optional[int] = 0
+    page: int = 1
+    page_size: int = 20
+    next_cursor: Optional[str] = None
+
+
+def legacy_page_response(items: list, total: int, page: int, page_size: int) -> bytes:
+    """旧路径：PageData → model_dump → ApiResponse → model_dump → jsonable_encoder → JSONResponse。"""
+    data = _LegacyPageData(items=items, total=total, page=page, page_size=page_size).model_dump()
+    content = ApiResponse(code=200, message="success", data=data).model_dump()
+    return JSONResponse(content=jsonable_encoder(content)).body
+
+
+def fast_page_response(items: list, total: int, page: int, page_size: int) -> bytes:
+    """新路径：预编码 FastJSONResponse。"""
+    return page_response(items, total, page, page_size).body
+
+
+def make_items(count: int) -> list[dict]:
+    """构造与用户列表接口相同结构的数据行。"""
+    now = datetime.now(timezone.utc)
+    return [
+        {
+            "id": i,
+            "username": f"user{i}",
+            "email": f"user{i}@example.com",
+            "phone": "13800000000",
+            "real_name": f"用户{i}",
+            "avatar": None,
+            "is_active": True,
+            "department_id": i % 20,
+            "department_name": "研发中心",
+            "roles": [{"id": 2, "name": "普通员工", "code": "staff"}],
+            "created_at": now.isoformat(),
+        }
+        for i in range(count)
+    ]
+
+
+def bench(fn, items: list, rounds: int) -> float:
+    """返回每秒可完成的响应数。"""
+    fn(items, len(items), 1, len(items))  # 预热
+    started = time.perf_counter()
+    for _ in range(rounds):
+        fn(items, len(items), 1, len(items))
+    return rounds / (time.perf_counter() - started)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=1000, help="每页行数")
+    parser.add_argument("--rounds", type=int, default=200, help="重复次数")
+    args = parser.parse_args()
+
+    items = make_items(args.items)
+    legacy = bench(legacy_page_response, items, args.rounds)
+    fast = bench(fast_page_response, items, args.rounds)
+    print(f"编码器: {'orjson' if orjson is not None else 'json (标准库)'}")
+    print(f"每页 {args.items} 行, {args.rounds} 轮")
+    print(f"  旧路径  : {legacy:10.1f} 次/秒")
+    print(f"  预编码  : {fast:10.1f} 次/秒  ({fast / legacy:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -17,8 +17,9 @@ from app.models import Base  # noqa: F401
 from app.core.config import get_settings
 from app.core.plugin_engine import plugin_engine
 
-# 执行发现以导入插件的 models.py
+# 发现插件并导入其 models.py
 plugin_engine.discover()
+plugin_engine.import_models()
 
 config = context.config
 settings = get_settings()
@@ -0,0 +1,39 @@
+"""Add pg_trgm indexes for user search
+
+Revision ID: 5f3b9e2c71a8
+Revises: d2826664ec25
+Create Date: 2026-10-18 14:05:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5f3b9e2c71a8'
+down_revision: Union[str, None] = 'd2826664ec25'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# 用户搜索涉及的列；GIN trigram 索引同时支持 ILIKE '%kw%'、ILIKE 'kw%' 与 similarity()
+SEARCH_COLUMNS = ('username', 'real_name', 'phone', 'email')
+
+
+def upgrade() -> None:
+    # 仅 PostgreSQL 需要；其它数据库由 UserService.search 的 Python 排序兜底
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for column in SEARCH_COLUMNS:
+        op.create_index(
+            f'ix_users_{column}_trgm', 'users', [column], unique=False,
+            postgresql_using='gin', postgresql_ops={column: 'gin_trgm_ops'},
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    for column in SEARCH_COLUMNS:
+        op.drop_index(f'ix_users_{column}_trgm', table_name='users')
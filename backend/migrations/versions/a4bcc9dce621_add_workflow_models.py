@@ -20,7 +20,9 @@ depends_on: Union[str, Sequence[str], None] = None
 
 def upgrade() -> None:
     # ### commands auto generated by Alembic - please adjust! ###
-    op.drop_table('announcements')
+    # 全新数据库上此表并不存在；公告与审批流的表由 c9e1f4a7b3d0 创建
+    if sa.inspect(op.get_bind()).has_table('announcements'):
+        op.drop_table('announcements')
     # ### end Alembic commands ###
 
 
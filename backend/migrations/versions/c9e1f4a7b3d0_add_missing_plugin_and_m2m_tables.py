@@ -0,0 +1,110 @@
+"""Add missing role_departments, announcement and workflow tables
+
+Revision ID: c9e1f4a7b3d0
+Revises: 5f3b9e2c71a8
+Create Date: 2026-10-18 14:30:00.000000
+
+早期迁移没有为 ``role_departments``、公告与审批流插件建表（这些表此前依赖启动时的
+``create_all``）。已由 ``create_all`` 建过表的数据库跳过对应的表。
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c9e1f4a7b3d0'
+down_revision: Union[str, None] = '5f3b9e2c71a8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _timestamps() -> list[sa.Column]:
+    return [
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    ]
+
+
+def upgrade() -> None:
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if 'role_departments' not in existing:
+        op.create_table('role_departments',
+        sa.Column('role_id', sa.Integer(), nullable=False),
+        sa.Column('department_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['department_id'], ['departments.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['role_id'], ['roles.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('role_id', 'department_id')
+        )
+
+    if 'announcements' not in existing:
+        op.create_table('announcements',
+        sa.Column('title', sa.String(length=255), nullable=False, comment='公告标题'),
+        sa.Column('content', sa.Text(), nullable=False, comment='公告内容(富文本)'),
+        sa.Column('author_id', sa.Integer(), nullable=True, comment='发布人ID'),
+        sa.Column('read_count', sa.Integer(), nullable=False, comment='阅读次数'),
+        *_timestamps(),
+        sa.ForeignKeyConstraint(['author_id'], ['users.id'], ondelete='SET NULL'),
+        sa.PrimaryKeyConstraint('id')
+        )
+
+    if 'workflow_defs' not in existing:
+        op.create_table('workflow_defs',
+        sa.Column('name', sa.String(length=100), nullable=False, comment='流程名称'),
+        sa.Column('description', sa.String(length=255), nullable=True, comment='流程描述'),
+        sa.Column('version', sa.Integer(), nullable=False, comment='版本号'),
+        sa.Column('is_active', sa.Boolean(), nullable=False, comment='是否启用'),
+        sa.Column('flow_data', sa.JSON(), nullable=False, comment='流定义JSON'),
+        sa.Column('form_data', sa.JSON(), nullable=True, comment='表单结构JSON'),
+        sa.Column('creator_id', sa.Integer(), nullable=False),
+        *_timestamps(),
+        sa.ForeignKeyConstraint(['creator_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_workflow_defs_name'), 'workflow_defs', ['name'], unique=False)
+
+    if 'workflow_instances' not in existing:
+        op.create_table('workflow_instances',
+        sa.Column('workflow_def_id', sa.Integer(), nullable=False),
+        sa.Column('initiator_id', sa.Integer(), nullable=False),
+        sa.Column('title', sa.String(length=200), nullable=False, comment='实例标题，例如: XXX的请假申请'),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('business_data', sa.JSON(), nullable=False),
+        sa.Column('current_node_ids', sa.JSON(), nullable=False, comment='当前正在执行的画布NodeID列表'),
+        sa.Column('end_time', sa.DateTime(), nullable=True, comment='流程结束时间'),
+        *_timestamps(),
+        sa.ForeignKeyConstraint(['initiator_id'], ['users.id']),
+        sa.ForeignKeyConstraint(['workflow_def_id'], ['workflow_defs.id']),
+        sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_workflow_instances_status'), 'workflow_instances', ['status'], unique=False)
+
+    if 'workflow_tasks' not in existing:
+        op.create_table('workflow_tasks',
+        sa.Column('instance_id', sa.Integer(), nullable=False),
+        sa.Column('node_id', sa.String(length=50), nullable=False, comment='对应前端图纸上的 Node ID'),
+        sa.Column('node_name', sa.String(length=100), nullable=False, comment='当前节点名称 (如: 主管审批)'),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('assignee_id', sa.Integer(), nullable=False),
+        sa.Column('comment', sa.Text(), nullable=True, comment='审批意见'),
+        sa.Column('handled_at', sa.DateTime(), nullable=True, comment='处理时间'),
+        *_timestamps(),
+        sa.ForeignKeyConstraint(['assignee_id'], ['users.id']),
+        sa.ForeignKeyConstraint(['instance_id'], ['workflow_instances.id']),
+        sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_workflow_tasks_status'), 'workflow_tasks', ['status'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_workflow_tasks_status'), table_name='workflow_tasks')
+    op.drop_table('workflow_tasks')
+    op.drop_index(op.f('ix_workflow_instances_status'), table_name='workflow_instances')
+    op.drop_table('workflow_instances')
+    op.drop_index(op.f('ix_workflow_defs_name'), table_name='workflow_defs')
+    op.drop_table('workflow_defs')
+    op.drop_table('announcements')
+    op.drop_table('role_departments')
@@ -0,0 +1,49 @@
+"""Add department closure table
+
+Revision ID: d2826664ec25
+Revises: a4bcc9dce621
+Create Date: 2026-10-18 10:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2826664ec25'
+down_revision: Union[str, None] = 'a4bcc9dce621'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('department_closure',
+    sa.Column('ancestor_id', sa.Integer(), nullable=False),
+    sa.Column('descendant_id', sa.Integer(), nullable=False),
+    sa.Column('depth', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['ancestor_id'], ['departments.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['descendant_id'], ['departments.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('ancestor_id', 'descendant_id')
+    )
+    op.create_index('ix_department_closure_descendant', 'department_closure', ['descendant_id', 'depth'], unique=False)
+
+    # 用递归 CTE 回填已有部门的闭包关系
+    op.execute(
+        """
+        INSERT INTO department_closure (ancestor_id, descendant_id, depth)
+        WITH RECURSIVE tree (ancestor_id, descendant_id, depth) AS (
+            SELECT id, id, 0 FROM departments
+            UNION ALL
+            SELECT t.ancestor_id, d.id, t.depth + 1
+            FROM tree t JOIN departments d ON d.parent_id = t.descendant_id
+        )
+        SELECT ancestor_id, descendant_id, depth FROM tree
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_department_closure_descendant', table_name='department_closure')
+    op.drop_table('department_closure')
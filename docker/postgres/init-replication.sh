@@ -0,0 +1,4 @@
+#!/bin/sh
+# 允许只读副本以流复制方式连接主库（docker-compose --profile replica）
+set -e
+echo "host replication all all scram-sha-256" >> "$PGDATA/pg_hba.conf"